@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'core'
+    name = 'apps.core'
+
+    def ready(self):
+        from apps.core.checks import verify_uuid_key_storage
+        connection_created.connect(verify_uuid_key_storage, dispatch_uid='verify_uuid_key_storage')
@@ -0,0 +1,52 @@
+"""
+Startup checks for settings that must match the existing database
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+_verified_aliases = set()
+
+
+def uuid_key_storage(connection) -> dict:
+    """
+    Map each existing UUIDModel table to whether its primary key column
+    is binary. Empty on backends with a native uuid type.
+    """
+    from apps.core.models import UUIDModel
+
+    if connection.features.has_native_uuid_field:
+        return {}
+
+    storage = {}
+    with connection.cursor() as cursor:
+        tables = set(connection.introspection.table_names(cursor))
+        for model in apps.get_models():
+            if not issubclass(model, UUIDModel) or model._meta.db_table not in tables:
+                continue
+            for column in connection.introspection.get_table_description(cursor, model._meta.db_table):
+                if column.name == model._meta.pk.column:
+                    field_type = connection.introspection.get_field_type(column.type_code, column)
+                    storage[model._meta.db_table] = field_type == 'BinaryField'
+    return storage
+
+
+def verify_uuid_key_storage(sender, connection, **kwargs):
+    """
+    connection_created receiver. Keys written in the other format never
+    match a lookup, so refuse to run instead of mixing both formats.
+    Checked once per database alias, as soon as the tables exist.
+    """
+    if connection.alias in _verified_aliases:
+        return
+
+    storage = uuid_key_storage(connection)
+    mismatched = sorted(table for table, binary in storage.items()
+                        if binary != settings.COMPACT_UUID_KEYS)
+    if mismatched:
+        raise ImproperlyConfigured(
+            f"COMPACT_UUID_KEYS={settings.COMPACT_UUID_KEYS} does not match the primary key "
+            f"columns of {', '.join(mismatched)} on database '{connection.alias}'"
+        )
+    if storage:
+        _verified_aliases.add(connection.alias)
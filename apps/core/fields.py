@@ -0,0 +1,44 @@
+"""
+Custom model fields
+"""
+import uuid
+from django.db import models
+
+
+class CompactUUIDField(models.UUIDField):
+    """
+    UUIDField stored in 16 bytes on every backend.
+    PostgreSQL keeps its native uuid type. SQLite, MySQL and Oracle get a
+    binary column instead of the 32-character hex string UUIDField uses.
+    """
+    BINARY_TYPES = {
+        'sqlite': 'blob',
+        'mysql': 'binary(16)',
+        'oracle': 'RAW(16)',
+    }
+
+    def get_internal_type(self):
+        # Not "UUIDField", so backends don't apply their hex string converters
+        return 'CompactUUIDField'
+
+    def db_type(self, connection):
+        if connection.features.has_native_uuid_field:
+            return 'uuid'
+        return self.BINARY_TYPES.get(connection.vendor, 'blob')
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        if value is None:
+            return None
+        if not isinstance(value, uuid.UUID):
+            value = self.to_python(value)
+
+        if connection.features.has_native_uuid_field:
+            return value
+        return value.bytes
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        if isinstance(value, (bytes, memoryview)):
+            return uuid.UUID(bytes=bytes(value))
+        return uuid.UUID(value)
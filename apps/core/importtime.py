@@ -0,0 +1,75 @@
+"""
+Import-time measurement for process cold starts
+"""
+import os
+import statistics
+import subprocess
+import sys
+from typing import List, NamedTuple, Optional
+
+
+# What each process type imports before it can serve work
+TARGETS = {
+    'manage': "import django; django.setup()",
+    'wsgi': "import coaching_sessions.wsgi",
+    'celery': (
+        "import django; django.setup(); "
+        "from coaching_sessions.celery import app; app.loader.import_default_modules()"
+    ),
+}
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+class ImportReport(NamedTuple):
+    target: str
+    total_ms: float
+    timings: List[ImportTiming]
+
+    def top(self, count: int = 20, key: str = 'self_us') -> List[ImportTiming]:
+        return sorted(self.timings, key=lambda timing: getattr(timing, key), reverse=True)[:count]
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse the stderr of `python -X importtime`"""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        timings.append(ImportTiming(
+            module=module.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(module) - len(module.lstrip()) - 1) // 2
+        ))
+    return timings
+
+
+def measure(target: str, settings_module: Optional[str] = None, runs: int = 3) -> ImportReport:
+    """
+    Import the target in fresh interpreters and keep the run with the median
+    total, so one slow run does not skew the report.
+    """
+    code = TARGETS.get(target, target)
+    env = dict(os.environ)
+    if settings_module:
+        env['DJANGO_SETTINGS_MODULE'] = settings_module
+
+    reports = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            env=env, capture_output=True, text=True, check=True
+        )
+        timings = parse_importtime(result.stderr)
+        total_ms = sum(timing.self_us for timing in timings) / 1000
+        reports.append(ImportReport(target, total_ms, timings))
+
+    median = statistics.median_low([report.total_ms for report in reports])
+    return next(report for report in reports if report.total_ms == median)
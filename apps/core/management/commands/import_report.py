@@ -0,0 +1,42 @@
+"""
+Report cold-start import time for the web, worker and manage.py processes
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.importtime import TARGETS, measure
+
+
+class Command(BaseCommand):
+    help = "Measure import time with `python -X importtime` and list the slowest modules"
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='*', default=list(TARGETS),
+                            help=f"Process types ({', '.join(TARGETS)}) or Python code to import")
+        parser.add_argument('--settings-module',
+                            help="DJANGO_SETTINGS_MODULE for the measured process, "
+                                 "e.g. coaching_sessions.settings_api")
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--cumulative', action='store_true',
+                            help="Rank modules by cumulative instead of self time")
+        parser.add_argument('--budget-ms', type=float,
+                            help="Fail if any target takes longer than this")
+
+    def handle(self, *args, **options):
+        key = 'cumulative_us' if options['cumulative'] else 'self_us'
+        over_budget = []
+
+        for target in options['targets']:
+            report = measure(target, settings_module=options['settings_module'], runs=options['runs'])
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{target}: {report.total_ms:.1f} ms across {len(report.timings)} modules"
+            ))
+            for timing in report.top(options['top'], key=key):
+                self.stdout.write(
+                    f"  {timing.self_us / 1000:8.1f} ms self {timing.cumulative_us / 1000:8.1f} ms cumulative"
+                    f"  {timing.module}"
+                )
+            if options['budget_ms'] is not None and report.total_ms > options['budget_ms']:
+                over_budget.append(target)
+
+        if over_budget:
+            raise CommandError(f"Over the {options['budget_ms']} ms budget: {', '.join(over_budget)}")
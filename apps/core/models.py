@@ -1,9 +1,11 @@
 """
 Core models and abstract base classes
 """
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
-import uuid
+from apps.core.fields import CompactUUIDField
+from apps.core.uuids import uuid7
 
 
 class TimestampedModel(models.Model):
@@ -15,9 +17,13 @@ class TimestampedModel(models.Model):
         abstract = True
 
 
+# 16-byte keys instead of 32-character hex strings on backends without a native uuid type
+UUIDPrimaryKeyField = CompactUUIDField if settings.COMPACT_UUID_KEYS else models.UUIDField
+
+
 class UUIDModel(models.Model):
-    """Abstract base model with UUID primary key"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    """Abstract base model with time-ordered UUID primary key"""
+    id = UUIDPrimaryKeyField(primary_key=True, default=uuid7, editable=False)
 
     class Meta:
         abstract = True
@@ -0,0 +1,174 @@
+"""
+Token-bucket rate limiting and load shedding for booking endpoints
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from django.conf import settings
+from django.core.cache import cache
+
+
+def _refill(state, capacity: float, per_second: float, now: float) -> float:
+    tokens, updated = state if state else (capacity, now)
+    return min(capacity, tokens + (now - updated) * per_second)
+
+
+def _wait(levels, buckets) -> float:
+    """Seconds until every bucket holds a token, 0 if they all do"""
+    return max((1 - tokens) / per_second
+               for tokens, (_, _, per_second) in zip(levels, buckets))
+
+
+class LocalBucketStore:
+    """
+    Token buckets kept in process memory. Bounded as an LRU: the least
+    recently used buckets are dropped first, and a dropped bucket has
+    usually refilled anyway, so dropping it is the same as keeping it full.
+    """
+
+    def __init__(self, max_buckets: int = 10000):
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, buckets) -> float:
+        """
+        Take one token from every (key, capacity, per_second) bucket, or
+        from none of them. Returns 0 if allowed, otherwise seconds to wait.
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = [_refill(self._buckets.get(key), capacity, per_second, now)
+                      for key, capacity, per_second in buckets]
+            allowed = all(tokens >= 1 for tokens in levels)
+            for (key, _, _), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return 0.0 if allowed else _wait(levels, buckets)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Limits in the shared cache so they hold across processes. Each bucket
+    becomes a fixed-window counter of `capacity` requests per refill period,
+    updated with the cache's atomic add/incr, so concurrent requests cannot
+    all read the same full bucket. A burst straddling a window boundary can
+    still see up to twice the capacity.
+    """
+
+    def _incr(self, cache_key: str, timeout: int) -> int:
+        if cache.add(cache_key, 1, timeout):
+            return 1
+        try:
+            return cache.incr(cache_key)
+        except ValueError:
+            # Expired between add and incr
+            cache.add(cache_key, 1, timeout)
+            return 1
+
+    def consume(self, buckets) -> float:
+        now = time.time()
+        taken = []
+        for key, capacity, per_second in buckets:
+            window = capacity / per_second
+            index = int(now // window)
+            cache_key = f'ratelimit:{key}:{index}'
+            count = self._incr(cache_key, math.ceil(window) + 1)
+            taken.append(cache_key)
+            if count > capacity:
+                # Give back what this request took so a rejection spends nothing
+                for taken_key in taken:
+                    try:
+                        cache.decr(taken_key)
+                    except ValueError:
+                        pass
+                return (index + 1) * window - now
+        return 0.0
+
+    def clear(self):
+        pass
+
+
+class LoadShedder:
+    """
+    Tracks database latency as an exponentially weighted moving average.
+    The average decays toward zero while no queries are observed, so
+    shedding stops by itself and traffic probes the database again.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self._latency = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        half_lives = (now - self._updated) / settings.BOOKING_SHED_HALF_LIFE
+        return self._latency * 0.5 ** half_lives
+
+    def record(self, seconds: float):
+        now = time.monotonic()
+        with self._lock:
+            self._latency = (1 - self.alpha) * self._decayed(now) + self.alpha * seconds
+            self._updated = now
+
+    def latency_ms(self) -> float:
+        with self._lock:
+            return self._decayed(time.monotonic()) * 1000
+
+    def should_shed(self) -> bool:
+        return self.latency_ms() > settings.BOOKING_SHED_LATENCY_MS
+
+    def observe(self, execute, sql, params, many, context):
+        """connection.execute_wrapper hook that times every query"""
+        started = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(time.monotonic() - started)
+
+    def reset(self):
+        with self._lock:
+            self._latency = 0.0
+            self._updated = time.monotonic()
+
+
+STORES = {
+    'local': LocalBucketStore(),
+    'cache': CacheBucketStore(),
+}
+
+shedder = LoadShedder()
+
+
+def check_booking_limits(expert_id, student_id) -> Optional[float]:
+    """
+    Apply the per-student, per-expert and global booking limits.
+    Returns None if the request may proceed, otherwise seconds to wait.
+    """
+    if shedder.should_shed():
+        return float(settings.BOOKING_SHED_HALF_LIFE)
+
+    store = STORES[settings.BOOKING_RATE_LIMIT_BACKEND]
+    limits = settings.BOOKING_RATE_LIMITS
+    # All or nothing, so a request rejected by one scope spends no tokens in the others
+    retry_after = store.consume([
+        (f'book:{scope}:{key}', limits[scope]['capacity'], limits[scope]['per_second'])
+        for scope, key in [('student', student_id), ('expert', expert_id), ('global', 'all')]
+    ])
+    return retry_after or None
+
+
+def reset():
+    """Clear all in-process limiter state"""
+    for store in STORES.values():
+        store.clear()
+    shedder.reset()
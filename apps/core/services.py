@@ -2,11 +2,17 @@
 Core business logic services
 """
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from datetime import timedelta
 from typing import Optional, List
 from django.db import transaction
+from django.db.models import Case, Count, F, Min, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Least
 from django.utils import timezone
-from apps.sessions.models import Session, SessionStatus
-from apps.users.models import Expert, Student
+from apps.core.slots import to_end_slot, to_slot
+from apps.core.tracing import start_span, inject, traced
+from apps.sessions.models import Session, SessionStatus, WaitlistEntry, WaitlistStatus
+from apps.users.models import Expert, ExpertStats, Student
 
 # here why was this abstarction needed?
 class SessionValidationService(ABC):
@@ -18,22 +24,176 @@ class SessionValidationService(ABC):
         """Validate if a booking can be made"""
         pass
 
+    def get_conflict(self, expert: Expert, student: Student, start_at: timezone.datetime,
+                     end_at: timezone.datetime) -> Optional[str]:
+        """Return the conflicting side ('expert' or 'student'), or None if free"""
+        if self.validate_booking(expert, student, start_at, end_at):
+            return None
+        return SessionConflictError.EXPERT
+
+    def find_conflicts(self, expert: Expert, student: Student,
+                       slots: List[tuple]) -> List[Optional[str]]:
+        """
+        Check many (start_at, end_at) slots at once.
+        Returns the conflicting side per slot, None when the slot is free.
+        Subclasses should override this with a single query.
+        """
+        return [self.get_conflict(expert, student, start_at, end_at)
+                for start_at, end_at in slots]
+
+
+class SessionConflictError(ValueError):
+    """Raised when a booking overlaps an active session"""
+
+    EXPERT = 'expert'
+    STUDENT = 'student'
+
+    def __init__(self, side: str):
+        self.side = side
+        super().__init__(f"{side.capitalize()} has overlapping sessions")
+
+
+def _sweep_conflicts(busy, slots: List[tuple]) -> List[bool]:
+    """
+    Flag slots overlapping any of the busy (start_slot, end_slot) intervals.
+    `busy` must be ordered by start_slot.
+    """
+    # Merge into disjoint intervals so both starts and ends are sorted
+    starts, ends = [], []
+    for start_at, end_at in busy:
+        if ends and start_at <= ends[-1]:
+            ends[-1] = max(ends[-1], end_at)
+        else:
+            starts.append(start_at)
+            ends.append(end_at)
+
+    conflicts = []
+    for start_at, end_at in slots:
+        # First busy interval ending after the slot starts
+        i = bisect_right(ends, start_at)
+        conflicts.append(i < len(starts) and starts[i] < end_at)
+    return conflicts
+
 
 class SessionOverlapValidator(SessionValidationService):
     """Concrete implementation for session overlap validation"""
     
+    ACTIVE_STATUSES = [SessionStatus.BOOKED, SessionStatus.JOINED, SessionStatus.IN_PROGRESS]
+
+    @traced
     def validate_booking(self, expert: Expert, student: Student, start_at: timezone.datetime, 
                         end_at: timezone.datetime) -> bool:
         """Check if expert has overlapping sessions"""
         overlapping_sessions = Session.objects.filter(
             expert=expert,
-            status__in=[SessionStatus.BOOKED, SessionStatus.JOINED, SessionStatus.IN_PROGRESS],
-            start_at__lt=end_at,
-            end_at__gt=start_at
+            status__in=self.ACTIVE_STATUSES,
+            start_slot__lt=to_end_slot(end_at),
+            end_slot__gt=to_slot(start_at)
         ).exclude(student=student)  # Exclude same student for idempotency
         
         return not overlapping_sessions.exists()
 
+    @traced
+    def find_conflicts(self, expert: Expert, student: Student,
+                       slots: List[tuple]) -> List[Optional[str]]:
+        """Check all slots against the expert's calendar with one query"""
+        if not slots:
+            return []
+
+        slot_keys = [(to_slot(start_at), to_end_slot(end_at)) for start_at, end_at in slots]
+
+        # Fetch every active session in the window spanned by the slots
+        busy = Session.objects.filter(
+            expert=expert,
+            status__in=self.ACTIVE_STATUSES,
+            start_slot__lt=max(end_slot for _, end_slot in slot_keys),
+            end_slot__gt=min(start_slot for start_slot, _ in slot_keys)
+        ).exclude(student=student).order_by('start_slot').values_list('start_slot', 'end_slot')
+
+        return [SessionConflictError.EXPERT if conflict else None
+                for conflict in _sweep_conflicts(busy, slot_keys)]
+
+
+class SessionDoubleBookingValidator(SessionOverlapValidator):
+    """
+    Checks both the expert's and the student's calendar in one query.
+    The OR over expert and student lets the database combine the
+    (expert, start_slot, end_slot) and (student, start_slot, end_slot) index scans.
+    An exact repeat of a booking is matched before validation, so sessions
+    between the same expert and student are checked like any other.
+    """
+
+    def _overlapping(self, expert: Expert, student: Student, start_at: timezone.datetime,
+                     end_at: timezone.datetime):
+        return Session.objects.filter(
+            Q(expert=expert) | Q(student=student),
+            status__in=self.ACTIVE_STATUSES,
+            start_slot__lt=to_end_slot(end_at),
+            end_slot__gt=to_slot(start_at)
+        )
+
+    @traced
+    def validate_booking(self, expert: Expert, student: Student, start_at: timezone.datetime,
+                        end_at: timezone.datetime) -> bool:
+        """Check if expert or student has overlapping sessions"""
+        return self.get_conflict(expert, student, start_at, end_at) is None
+
+    @traced
+    def conflict_counts(self, expert: Expert, student: Student, start_at: timezone.datetime,
+                        end_at: timezone.datetime) -> dict:
+        """
+        Overlapping active sessions on each calendar, in one query.
+        own_conflicts counts the ones between this expert and this student.
+        """
+        return self._overlapping(expert, student, start_at, end_at).aggregate(
+            expert_conflicts=Count('id', filter=Q(expert=expert)),
+            student_conflicts=Count('id', filter=Q(student=student)),
+            own_conflicts=Count('id', filter=Q(expert=expert, student=student))
+        )
+
+    @traced
+    def get_conflict(self, expert: Expert, student: Student, start_at: timezone.datetime,
+                     end_at: timezone.datetime) -> Optional[str]:
+        counts = self.conflict_counts(expert, student, start_at, end_at)
+
+        if counts['expert_conflicts']:
+            return SessionConflictError.EXPERT
+        if counts['student_conflicts']:
+            return SessionConflictError.STUDENT
+        return None
+
+    @traced
+    def find_conflicts(self, expert: Expert, student: Student,
+                       slots: List[tuple]) -> List[Optional[str]]:
+        """Check all slots against both calendars with one query"""
+        if not slots:
+            return []
+
+        busy = self._overlapping(
+            expert, student,
+            min(start_at for start_at, _ in slots),
+            max(end_at for _, end_at in slots)
+        ).order_by('start_slot').values_list('expert_id', 'start_slot', 'end_slot')
+
+        expert_busy, student_busy = [], []
+        for expert_id, start_slot, end_slot in busy:
+            if expert_id == expert.id:
+                expert_busy.append((start_slot, end_slot))
+            else:
+                student_busy.append((start_slot, end_slot))
+
+        slot_keys = [(to_slot(start_at), to_end_slot(end_at)) for start_at, end_at in slots]
+        conflicts = []
+        for expert_conflict, student_conflict in zip(_sweep_conflicts(expert_busy, slot_keys),
+                                                      _sweep_conflicts(student_busy, slot_keys)):
+            if expert_conflict:
+                conflicts.append(SessionConflictError.EXPERT)
+            elif student_conflict:
+                conflicts.append(SessionConflictError.STUDENT)
+            else:
+                conflicts.append(None)
+        return conflicts
+
 
 class SessionIdempotencyService:
     """Service to handle idempotent session creation"""
@@ -41,6 +201,7 @@ class SessionIdempotencyService:
     def __init__(self, validator: SessionValidationService):
         self.validator = validator
     
+    @traced
     def create_or_get_session(self, expert: Expert, student: Student, start_at: timezone.datetime, 
                              end_at: timezone.datetime) -> tuple[Session, bool]:
         """
@@ -51,17 +212,18 @@ class SessionIdempotencyService:
         existing_session = Session.objects.filter(
             expert=expert,
             student=student,
-            start_at=start_at,
-            end_at=end_at,
+            start_slot=to_slot(start_at),
+            end_slot=to_end_slot(end_at),
             status=SessionStatus.BOOKED
-        ).first()
+        ).select_related('expert', 'student').first()
         
         if existing_session:
             return existing_session, False
         
         # Validate no overlap with other students
-        if not self.validator.validate_booking(expert, student, start_at, end_at):
-            raise ValueError("Expert has overlapping sessions")
+        conflict = self.validator.get_conflict(expert, student, start_at, end_at)
+        if conflict:
+            raise SessionConflictError(conflict)
         
         # Create new session
         session = Session.objects.create(
@@ -70,14 +232,63 @@ class SessionIdempotencyService:
             start_at=start_at,
             end_at=end_at
         )
+        ExpertStatsService.record_booking(expert.id, start_at)
         
         return session, True
 
+    @traced
+    def create_series(self, expert: Expert, student: Student, start_at: timezone.datetime,
+                      end_at: timezone.datetime, interval: timedelta,
+                      occurrences: int) -> tuple[List[Session], bool, List[dict]]:
+        """
+        Book a recurring series, e.g. every Tuesday 17:00 for 20 weeks.
+        Occurrences already booked by this student are returned as-is,
+        conflicting ones are skipped and the rest are inserted in bulk.
+        Returns: (sessions, created, conflicts)
+        """
+        slots = [(start_at + interval * i, end_at + interval * i) for i in range(occurrences)]
+
+        # Same student and slot counts as already booked (idempotent)
+        existing = {
+            (session.start_slot, session.end_slot): session
+            for session in Session.objects.filter(
+                expert=expert,
+                student=student,
+                start_slot__in=[to_slot(slot_start) for slot_start, _ in slots],
+                status=SessionStatus.BOOKED
+            ).select_related('expert', 'student')
+        }
+
+        slot_conflicts = self.validator.find_conflicts(expert, student, slots)
+
+        sessions, new_sessions, conflicts = [], [], []
+        for (slot_start, slot_end), conflict in zip(slots, slot_conflicts):
+            slot_key = (to_slot(slot_start), to_end_slot(slot_end))
+            if slot_key in existing:
+                sessions.append(existing[slot_key])
+            elif conflict:
+                conflicts.append({'start_at': slot_start, 'end_at': slot_end, 'conflict': conflict})
+            else:
+                new_sessions.append(Session(
+                    expert=expert,
+                    student=student,
+                    start_at=slot_start,
+                    end_at=slot_end
+                ))
+
+        if new_sessions:
+            sessions.extend(Session.objects.bulk_create(new_sessions))
+            ExpertStatsService.record_booking(expert.id, new_sessions[0].start_at, count=len(new_sessions))
+        sessions.sort(key=lambda session: session.start_at)
+
+        return sessions, bool(new_sessions), conflicts
+
 
 class SessionStateService:
     """Service to manage session state transitions"""
     
     @staticmethod
+    @traced
     def join_session(session: Session) -> Session:
         """Mark session as joined"""
         if session.status != SessionStatus.BOOKED:
@@ -86,9 +297,11 @@ class SessionStateService:
         session.status = SessionStatus.JOINED
         session.joined_at = timezone.now()
         session.save()
+        ExpertStatsService.record_join(session.expert_id)
         return session
     
     @staticmethod
+    @traced
     def end_session(session: Session) -> Session:
         """Mark session as ended and trigger summary generation"""
         if session.status not in [SessionStatus.JOINED, SessionStatus.IN_PROGRESS]:
@@ -97,9 +310,313 @@ class SessionStateService:
         session.status = SessionStatus.COMPLETED
         session.ended_at = timezone.now()
         session.save()
+        ExpertStatsService.record_completion(session.expert_id, session.duration_minutes)
         
         # Trigger Celery task for summary generation
-        from apps.sessions.tasks import generate_session_summary
-        generate_session_summary.delay(str(session.id))
+        from apps.sessions.tasks import generate_session_summary, SUMMARY_PRIORITY_REALTIME
+        with start_span('celery.publish generate_session_summary', {'session.id': str(session.id)}):
+            generate_session_summary.apply_async(
+                args=[str(session.id)], priority=SUMMARY_PRIORITY_REALTIME, headers=inject()
+            )
+        
+        return session
+
+    @staticmethod
+    @traced
+    def cancel_session(session: Session, validator: Optional[SessionValidationService] = None) -> tuple[Session, List[Session]]:
+        """
+        Cancel a booked session and promote waitlisted students into the freed slot.
+        Returns: (session, promoted_sessions)
+        """
+        if session.status != SessionStatus.BOOKED:
+            raise ValueError("Session cannot be cancelled in current state")
+        
+        now = timezone.now()
+        with transaction.atomic():
+            # Conditional update: the slot may already have started, which save() rejects
+            cancelled = Session.objects.filter(id=session.id, status=SessionStatus.BOOKED).update(
+                status=SessionStatus.CANCELLED, ended_at=now, updated_at=now
+            )
+            if not cancelled:
+                raise ValueError("Session cannot be cancelled in current state")
+            
+            session.status = SessionStatus.CANCELLED
+            session.ended_at = now
+            ExpertStatsService.record_cancellation(session.expert_id, no_show=now >= session.start_at)
+            
+            promoted = WaitlistService.promote(
+                session.expert, session.start_at, session.end_at,
+                validator or SessionDoubleBookingValidator(),
+                freed_by=session.student
+            )
+        
+        return session, promoted
+
+    @staticmethod
+    @traced
+    def join_sessions(session_ids: List) -> dict:
+        """
+        Join many sessions with a single conditional UPDATE.
+        Returns {session_id: 'joined' | 'invalid_state' | 'not_found'}
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Lock the rows so the UPDATE below matches exactly what was checked
+            rows = list(Session.objects.select_for_update().filter(id__in=session_ids).values_list(
+                'id', 'status', 'expert_id'
+            ))
+            joinable = {session_id: expert_id for session_id, status, expert_id in rows
+                        if status == SessionStatus.BOOKED}
+            found = {session_id for session_id, _, _ in rows}
+            
+            Session.objects.filter(id__in=joinable, status=SessionStatus.BOOKED).update(
+                status=SessionStatus.JOINED, joined_at=now, updated_at=now
+            )
+            for expert_id in set(joinable.values()):
+                ExpertStatsService.record_join(expert_id)
+        
+        return SessionStateService._outcomes(session_ids, found, joinable, 'joined')
+
+    @staticmethod
+    @traced
+    def end_sessions(session_ids: List) -> dict:
+        """
+        End many sessions with a single conditional UPDATE and publish all
+        summary tasks in one batch.
+        Returns {session_id: 'ended' | 'invalid_state' | 'not_found'}
+        """
+        now = timezone.now()
+        endable_statuses = [SessionStatus.JOINED, SessionStatus.IN_PROGRESS]
+        with transaction.atomic():
+            rows = list(Session.objects.select_for_update().filter(id__in=session_ids).values_list(
+                'id', 'status', 'expert_id', 'start_at', 'end_at'
+            ))
+            endable = {}
+            completed_by_expert = {}
+            for session_id, status, expert_id, start_at, end_at in rows:
+                if status in endable_statuses:
+                    endable[session_id] = expert_id
+                    count, minutes = completed_by_expert.get(expert_id, (0, 0))
+                    completed_by_expert[expert_id] = (
+                        count + 1, minutes + int((end_at - start_at).total_seconds() / 60)
+                    )
+            found = {row[0] for row in rows}
+            
+            Session.objects.filter(id__in=endable, status__in=endable_statuses).update(
+                status=SessionStatus.COMPLETED, ended_at=now, updated_at=now
+            )
+            for expert_id, (count, minutes) in completed_by_expert.items():
+                ExpertStatsService.record_completion(expert_id, minutes, count=count)
+        
+        if endable:
+            from apps.sessions.tasks import enqueue_summaries, SUMMARY_PRIORITY_REALTIME
+            enqueue_summaries(list(endable), priority=SUMMARY_PRIORITY_REALTIME)
         
-        return session
\ No newline at end of file
+        return SessionStateService._outcomes(session_ids, found, endable, 'ended')
+
+    @staticmethod
+    def _outcomes(session_ids: List, found: set, transitioned, outcome: str) -> dict:
+        results = {}
+        for session_id in session_ids:
+            if session_id in transitioned:
+                results[session_id] = outcome
+            elif session_id in found:
+                results[session_id] = 'invalid_state'
+            else:
+                results[session_id] = 'not_found'
+        return results
+
+
+class ExpertStatsService:
+    """Service to keep ExpertStats in step with session transitions"""
+
+    @staticmethod
+    def _apply(expert_id, **updates):
+        """Apply F() updates to the stats row, building it from scratch if missing"""
+        updated = ExpertStats.objects.filter(expert_id=expert_id).update(
+            updated_at=timezone.now(), **updates
+        )
+        if not updated:
+            # The rebuild already counts the session that triggered this update
+            ExpertStatsService.rebuild([expert_id])
+
+    @staticmethod
+    @traced
+    def record_booking(expert_id, start_at: timezone.datetime, count: int = 1):
+        """New session(s) booked; start_at is the earliest new slot"""
+        ExpertStatsService._apply(
+            expert_id,
+            total_sessions=F('total_sessions') + count,
+            # A stored slot in the past was never joined; it is no longer "next"
+            next_booked_at=Case(
+                When(next_booked_at__gte=timezone.now(), then=Least(F('next_booked_at'), Value(start_at))),
+                default=Value(start_at)
+            )
+        )
+
+    @staticmethod
+    def _next_booked_at():
+        return Subquery(
+            Session.objects.filter(
+                expert_id=OuterRef('expert_id'),
+                status=SessionStatus.BOOKED,
+                start_at__gte=timezone.now()
+            ).order_by('start_at').values('start_at')[:1]
+        )
+
+    @staticmethod
+    @traced
+    def record_join(expert_id):
+        """A booked session left the BOOKED state, so the next slot may move"""
+        ExpertStatsService._apply(expert_id, next_booked_at=ExpertStatsService._next_booked_at())
+
+    @staticmethod
+    @traced
+    def record_cancellation(expert_id, no_show: bool):
+        updates = {'next_booked_at': ExpertStatsService._next_booked_at()}
+        if no_show:
+            updates['no_show_sessions'] = F('no_show_sessions') + 1
+        ExpertStatsService._apply(expert_id, **updates)
+
+    @staticmethod
+    @traced
+    def record_completion(expert_id, minutes: int, count: int = 1):
+        ExpertStatsService._apply(
+            expert_id,
+            completed_sessions=F('completed_sessions') + count,
+            completed_minutes=F('completed_minutes') + minutes
+        )
+
+    @staticmethod
+    @traced
+    def rebuild(expert_ids: Optional[List] = None, batch_size: int = 1000) -> int:
+        """
+        Recompute stats from the sessions table in one grouped query and
+        upsert them in bulk. Rebuilds every expert when expert_ids is None.
+        Returns the number of stats rows written.
+        """
+        now = timezone.now()
+        experts = Expert.objects.all()
+        if expert_ids is not None:
+            experts = experts.filter(id__in=[Expert._meta.pk.to_python(expert_id) for expert_id in expert_ids])
+
+        # Grouped over experts LEFT JOIN sessions, so experts without sessions get zeros
+        rows = experts.values('id').annotate(
+            total=Count('sessions'),
+            completed=Count('sessions', filter=Q(sessions__status=SessionStatus.COMPLETED)),
+            completed_duration=Sum(
+                F('sessions__end_at') - F('sessions__start_at'),
+                filter=Q(sessions__status=SessionStatus.COMPLETED)
+            ),
+            # Still BOOKED after the end, or cancelled at or after the start, never joined
+            no_show=Count('sessions', filter=Q(
+                sessions__status=SessionStatus.BOOKED,
+                sessions__end_at__lt=now
+            ) | Q(
+                sessions__status=SessionStatus.CANCELLED,
+                sessions__joined_at__isnull=True,
+                sessions__ended_at__gte=F('sessions__start_at')
+            )),
+            next_booked=Min('sessions__start_at', filter=Q(
+                sessions__status=SessionStatus.BOOKED,
+                sessions__start_at__gte=now
+            ))
+        ).order_by()
+
+        stats = []
+        for row in rows.iterator(chunk_size=batch_size):
+            duration = row['completed_duration']
+            stats.append(ExpertStats(
+                expert_id=row['id'],
+                total_sessions=row['total'],
+                completed_sessions=row['completed'],
+                completed_minutes=int(duration.total_seconds() // 60) if duration else 0,
+                no_show_sessions=row['no_show'],
+                next_booked_at=row['next_booked']
+            ))
+
+        ExpertStats.objects.bulk_create(
+            stats,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['expert'],
+            update_fields=[
+                'total_sessions', 'completed_sessions', 'completed_minutes',
+                'no_show_sessions', 'next_booked_at', 'updated_at'
+            ]
+        )
+        return len(stats)
+
+
+class WaitlistService:
+    """Service to manage the FIFO waitlist for taken slots"""
+
+    @staticmethod
+    def _waiting(expert: Expert, start_at: timezone.datetime, end_at: timezone.datetime):
+        return WaitlistEntry.objects.filter(
+            expert=expert,
+            status=WaitlistStatus.WAITING,
+            start_at__lt=end_at,
+            end_at__gt=start_at
+        )
+
+    @staticmethod
+    @traced
+    def join(expert: Expert, student: Student, start_at: timezone.datetime,
+             end_at: timezone.datetime) -> tuple[WaitlistEntry, bool]:
+        """
+        Add a student to the waitlist for a slot (idempotent)
+        Returns: (entry, created)
+        """
+        return WaitlistEntry.objects.get_or_create(
+            expert=expert,
+            student=student,
+            start_at=start_at,
+            end_at=end_at,
+            status=WaitlistStatus.WAITING
+        )
+
+    @staticmethod
+    @traced
+    def position(entry: WaitlistEntry) -> int:
+        """1-based place in line among entries competing for an overlapping slot"""
+        return WaitlistService._waiting(entry.expert_id, entry.start_at, entry.end_at).filter(
+            Q(created_at__lt=entry.created_at) | Q(created_at=entry.created_at, id__lte=entry.id)
+        ).count()
+
+    @staticmethod
+    @traced
+    def promote(expert: Expert, start_at: timezone.datetime, end_at: timezone.datetime,
+                validator: SessionValidationService, freed_by: Optional[Student] = None) -> List[Session]:
+        """
+        Book waiting students into a freed window in FIFO order.
+        Entries that still conflict (e.g. the student booked elsewhere) keep waiting,
+        and the student who freed the window is never booked straight back into it.
+        Must run inside the transaction that freed the slot.
+        """
+        entries = WaitlistService._waiting(expert, start_at, end_at).filter(
+            start_at__gt=timezone.now()  # slots that already started cannot be booked
+        )
+        if freed_by is not None:
+            entries = entries.exclude(student=freed_by)
+        entries = entries.select_for_update().select_related('expert', 'student').order_by('created_at', 'id')
+
+        promoted = []
+        for entry in entries:
+            if validator.get_conflict(entry.expert, entry.student, entry.start_at, entry.end_at):
+                continue
+
+            session = Session.objects.create(
+                expert=entry.expert,
+                student=entry.student,
+                start_at=entry.start_at,
+                end_at=entry.end_at
+            )
+            ExpertStatsService.record_booking(entry.expert_id, entry.start_at)
+
+            entry.status = WaitlistStatus.PROMOTED
+            entry.session = session
+            entry.save(update_fields=['status', 'session', 'updated_at'])
+            promoted.append(session)
+
+        return promoted
@@ -0,0 +1,49 @@
+"""
+Canonical booking slots
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+SLOT_UNIT = timedelta(minutes=1)
+
+
+def to_slot(value: datetime) -> int:
+    """
+    Integer slot key: whole minutes since the Unix epoch.
+    The same instant gives the same key whatever offset or
+    sub-minute precision the client sent it with.
+    """
+    return (value - EPOCH) // SLOT_UNIT
+
+
+def to_end_slot(value: datetime) -> int:
+    """
+    Slot key for the end of an interval, rounded up so a session
+    ending mid-minute still covers that minute in overlap checks.
+    """
+    return -((EPOCH - value) // SLOT_UNIT)
+
+
+def from_slot(slot: int) -> datetime:
+    """UTC datetime at the start of a slot"""
+    return EPOCH + slot * SLOT_UNIT
+
+
+def normalize(value: datetime, granularity: int = None) -> datetime:
+    """
+    Convert to UTC and truncate to the slot granularity in minutes
+    (SESSION_SLOT_GRANULARITY_MINUTES by default).
+    """
+    if granularity is None:
+        granularity = settings.SESSION_SLOT_GRANULARITY_MINUTES
+    return from_slot(to_slot(value) // granularity * granularity)
+
+
+def normalize_end(value: datetime, granularity: int = None) -> datetime:
+    """
+    Like normalize, but rounds up so the slot still covers the requested end.
+    """
+    if granularity is None:
+        granularity = settings.SESSION_SLOT_GRANULARITY_MINUTES
+    return from_slot(-(-to_end_slot(value) // granularity) * granularity)
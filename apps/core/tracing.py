@@ -0,0 +1,215 @@
+"""
+Lightweight OpenTelemetry-style tracing.
+
+Spans nest through a context variable and propagate across processes with
+the W3C `traceparent` header, over HTTP requests and Celery task headers.
+Tracing is off unless TRACING_ENABLED is set, and start_span() is a no-op
+then. TRACING_EXPORTER picks where finished spans go.
+"""
+import functools
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.utils.module_loading import import_string
+
+
+TRACEPARENT_HEADER = 'traceparent'
+TRACEPARENT_PATTERN = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+logger = logging.getLogger('apps.tracing')
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+
+
+class Span:
+    def __init__(self, name: str, context: SpanContext, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict] = None):
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.status = 'OK'
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.context.trace_id
+
+    @property
+    def span_id(self) -> str:
+        return self.context.span_id
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start_ns': self.start_ns,
+            'end_ns': self.end_ns,
+            'status': self.status,
+            'attributes': self.attributes,
+        }
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list; meant for tests"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def clear(self):
+        self.spans.clear()
+
+
+class LoggingSpanExporter:
+    """Writes each finished span as one JSON line to the apps.tracing logger"""
+
+    def export(self, span: Span):
+        logger.info(json.dumps(span.to_dict(), default=str))
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar('current_span', default=None)
+_exporters = {}
+
+
+def is_enabled() -> bool:
+    return getattr(settings, 'TRACING_ENABLED', False)
+
+
+def get_exporter():
+    path = settings.TRACING_EXPORTER
+    if path not in _exporters:
+        _exporters[path] = import_string(path)()
+    return _exporters[path]
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def start_span(name: str, attributes: Optional[Dict] = None, parent: Optional[SpanContext] = None):
+    """
+    Open a span as a child of `parent`, or of the current span if no parent
+    is given. Yields None when tracing is disabled.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    if parent is None and _current_span.get() is not None:
+        parent = _current_span.get().context
+    context = SpanContext(
+        trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex()
+    )
+    span = Span(name, context, parent_id=parent.span_id if parent else None, attributes=attributes)
+
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as exc:
+        span.status = 'ERROR'
+        span.set_attribute('exception.type', type(exc).__name__)
+        raise
+    finally:
+        span.end_ns = time.time_ns()
+        _current_span.reset(token)
+        get_exporter().export(span)
+
+
+def traced(func):
+    """Wrap a function call in a span named after its qualified name"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span(func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def inject(headers: Optional[Dict] = None) -> Dict:
+    """Add the current span as a traceparent header"""
+    headers = {} if headers is None else headers
+    span = _current_span.get()
+    if span is not None:
+        headers[TRACEPARENT_HEADER] = f'00-{span.trace_id}-{span.span_id}-01'
+    return headers
+
+
+def extract(traceparent: Optional[str]) -> Optional[SpanContext]:
+    match = TRACEPARENT_PATTERN.match(traceparent or '')
+    if match is None:
+        return None
+    return SpanContext(trace_id=match.group(1), span_id=match.group(2))
+
+
+def extract_from_task(request) -> Optional[SpanContext]:
+    """
+    Read the traceparent of a Celery task request. Workers expose custom
+    headers as request attributes; eager calls keep them in request.headers.
+    """
+    traceparent = getattr(request, TRACEPARENT_HEADER, None)
+    if traceparent is None:
+        traceparent = (getattr(request, 'headers', None) or {}).get(TRACEPARENT_HEADER)
+    return extract(traceparent)
+
+
+def _trace_query(execute, sql, params, many, context):
+    with start_span('db.query', {'db.statement': sql}):
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def trace_queries():
+    """Open a child span for every SQL query run in this block"""
+    if not is_enabled():
+        yield
+        return
+    with connection.execute_wrapper(_trace_query):
+        yield
+
+
+class TracingMiddleware:
+    """Opens a root span per request and a child span per SQL query"""
+
+    def __init__(self, get_response):
+        if not is_enabled():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        parent = extract(request.headers.get(TRACEPARENT_HEADER))
+        with start_span(f'HTTP {request.method} {request.path}', {'http.method': request.method},
+                        parent=parent) as span:
+            with trace_queries():
+                response = self.get_response(request)
+            span.set_attribute('http.status_code', response.status_code)
+            resolver_match = getattr(request, 'resolver_match', None)
+            if resolver_match is not None:
+                span.set_attribute('http.route', resolver_match.route)
+        return response
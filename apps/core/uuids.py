@@ -0,0 +1,26 @@
+"""
+Time-ordered UUID generation
+"""
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUID version 7 (RFC 9562): 48-bit Unix milliseconds, 12 bits of
+    sub-millisecond time, then 62 random bits. Keys generated later sort
+    later, so inserts land at the right edge of the primary key B-tree
+    instead of splitting random pages.
+    """
+    nanoseconds = time.time_ns()
+    milliseconds = nanoseconds // 1_000_000
+    sub_millisecond = (nanoseconds % 1_000_000) * 4096 // 1_000_000
+    random_bits = int.from_bytes(os.urandom(8), 'big') & ((1 << 62) - 1)
+
+    value = (milliseconds & ((1 << 48) - 1)) << 80
+    value |= 0x7 << 76  # version
+    value |= sub_millisecond << 64
+    value |= 0b10 << 62  # RFC 4122 variant
+    value |= random_bits
+    return uuid.UUID(int=value)
@@ -1,15 +1,37 @@
+import math
+from datetime import timedelta
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import connection, transaction
 from apps.sessions.models import Session
 from apps.users.models import Expert, Student
 from apps.sessions.serializers import (
-    SessionSerializer, BookSessionSerializer, 
-    JoinSessionSerializer, EndSessionSerializer
+    SessionSerializer, BookSessionSerializer, BookRecurringSessionSerializer,
+    JoinSessionSerializer, EndSessionSerializer, CancelSessionSerializer,
+    BulkSessionSerializer, WaitlistEntrySerializer
 )
-from apps.core.services import SessionIdempotencyService, SessionOverlapValidator, SessionStateService
+from apps.core import ratelimit
+from apps.core.services import (
+    SessionIdempotencyService, SessionDoubleBookingValidator, SessionStateService,
+    SessionConflictError, WaitlistService
+)
+
+
+def _rate_limited(serializer):
+    """429 response when the booking limits reject this expert and student, else None"""
+    retry_after = ratelimit.check_booking_limits(
+        serializer.validated_data['expert_id'], serializer.validated_data['student_id']
+    )
+    if retry_after is None:
+        return None
+    return Response(
+        {'error': 'Too many booking requests'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS,
+        headers={'Retry-After': str(math.ceil(retry_after))}
+    )
 
 
 @api_view(['POST'])
@@ -18,15 +40,20 @@ def book_session(request):
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
+    # Reject stampedes before they reach the overlap query and its locks
+    limited = _rate_limited(serializer)
+    if limited:
+        return limited
+    
     try:
         # this will make sure the race condition is handled when two users try to book at same time
-        with transaction.atomic():
+        with connection.execute_wrapper(ratelimit.shedder.observe), transaction.atomic():
             # Get expert and student
             expert = get_object_or_404(Expert, id=serializer.validated_data['expert_id'])
             student = get_object_or_404(Student, id=serializer.validated_data['student_id'])
             
             # Create session service
-            validator = SessionOverlapValidator()
+            validator = SessionDoubleBookingValidator()
             session_service = SessionIdempotencyService(validator)
             
             # Create or get session
@@ -45,11 +72,74 @@ def book_session(request):
             else:
                 return Response(session_serializer.data, status=status.HTTP_200_OK)
                 
+    except SessionConflictError as e:
+        return Response(
+            {'error': str(e), 'conflict': e.side}, 
+            status=status.HTTP_409_CONFLICT
+        )
     except ValueError as e:
         return Response(
             {'error': str(e)}, 
             status=status.HTTP_409_CONFLICT
         )
+    except Http404:
+        raise
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def book_recurring_session(request):
+    serializer = BookRecurringSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    limited = _rate_limited(serializer)
+    if limited:
+        return limited
+    
+    try:
+        with connection.execute_wrapper(ratelimit.shedder.observe), transaction.atomic():
+            expert = get_object_or_404(Expert, id=serializer.validated_data['expert_id'])
+            student = get_object_or_404(Student, id=serializer.validated_data['student_id'])
+            
+            validator = SessionDoubleBookingValidator()
+            session_service = SessionIdempotencyService(validator)
+            
+            # Expand the series and book every free occurrence
+            sessions, created, conflicts = session_service.create_series(
+                expert=expert,
+                student=student,
+                start_at=serializer.validated_data['start_at'],
+                end_at=serializer.validated_data['end_at'],
+                interval=timedelta(days=serializer.validated_data['interval_days']),
+                occurrences=serializer.validated_data['occurrences']
+            )
+            
+            data = {
+                'sessions': SessionSerializer(sessions, many=True).data,
+                'conflicts': [
+                    {
+                        'start_at': conflict['start_at'].isoformat(),
+                        'end_at': conflict['end_at'].isoformat(),
+                        'conflict': conflict['conflict'],
+                    }
+                    for conflict in conflicts
+                ],
+            }
+            
+            if created:
+                return Response(data, status=status.HTTP_201_CREATED)
+            elif sessions:
+                return Response(data, status=status.HTTP_200_OK)
+            else:
+                return Response(data, status=status.HTTP_409_CONFLICT)
+                
+    except Http404:
+        raise
     except Exception as e:
         return Response(
             {'error': 'Internal server error'}, 
@@ -64,7 +154,9 @@ def join_session(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        session = get_object_or_404(Session, id=serializer.validated_data['session_id'])
+        session = get_object_or_404(
+            Session.objects.select_related('expert', 'student'), id=serializer.validated_data['session_id']
+        )
         session = SessionStateService.join_session(session)
         
         session_serializer = SessionSerializer(session)
@@ -75,6 +167,8 @@ def join_session(request):
             {'error': str(e)}, 
             status=status.HTTP_400_BAD_REQUEST
         )
+    except Http404:
+        raise
     except Exception as e:
         return Response(
             {'error': 'Internal server error'}, 
@@ -89,7 +183,9 @@ def end_session(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        session = get_object_or_404(Session, id=serializer.validated_data['session_id'])
+        session = get_object_or_404(
+            Session.objects.select_related('expert', 'student'), id=serializer.validated_data['session_id']
+        )
         session = SessionStateService.end_session(session)
         
         session_serializer = SessionSerializer(session)
@@ -100,8 +196,123 @@ def end_session(request):
             {'error': str(e)}, 
             status=status.HTTP_400_BAD_REQUEST
         )
+    except Http404:
+        raise
     except Exception as e:
         return Response(
             {'error': 'Internal server error'}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        )
+
+
+@api_view(['POST'])
+def cancel_session(request):
+    serializer = CancelSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        session = get_object_or_404(
+            Session.objects.select_related('expert', 'student'), id=serializer.validated_data['session_id']
+        )
+        session, promoted = SessionStateService.cancel_session(session)
+        
+        data = SessionSerializer(session).data
+        data['promoted_session_ids'] = [str(promoted_session.id) for promoted_session in promoted]
+        return Response(data, status=status.HTTP_200_OK)
+        
+    except ValueError as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    except Http404:
+        raise
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def join_waitlist(request):
+    serializer = BookSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    limited = _rate_limited(serializer)
+    if limited:
+        return limited
+    
+    try:
+        with connection.execute_wrapper(ratelimit.shedder.observe), transaction.atomic():
+            expert = get_object_or_404(Expert, id=serializer.validated_data['expert_id'])
+            student = get_object_or_404(Student, id=serializer.validated_data['student_id'])
+            start_at = serializer.validated_data['start_at']
+            end_at = serializer.validated_data['end_at']
+            
+            # Only a slot taken on the expert's side can free up for this student
+            counts = SessionDoubleBookingValidator().conflict_counts(expert, student, start_at, end_at)
+            if not counts['expert_conflicts'] and not counts['student_conflicts']:
+                return Response(
+                    {'error': 'Slot is available, book it directly'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # Waiting for a slot you already hold would book you into it again on cancel
+            if not counts['expert_conflicts'] or counts['own_conflicts']:
+                error = SessionConflictError(SessionConflictError.STUDENT)
+                return Response(
+                    {'error': str(error), 'conflict': error.side},
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            entry, created = WaitlistService.join(expert, student, start_at, end_at)
+            
+            data = WaitlistEntrySerializer(entry).data
+            data['position'] = WaitlistService.position(entry)
+            
+            if created:
+                return Response(data, status=status.HTTP_201_CREATED)
+            else:
+                return Response(data, status=status.HTTP_200_OK)
+                
+    except Http404:
+        raise
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+def _bulk_transition(request, transition):
+    serializer = BulkSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        # Drop duplicates but keep the request order
+        session_ids = list(dict.fromkeys(serializer.validated_data['session_ids']))
+        results = transition(session_ids)
+        
+        return Response(
+            {'results': {str(session_id): outcome for session_id, outcome in results.items()}},
+            status=status.HTTP_200_OK
+        )
+        
+    except Exception as e:
+        return Response(
+            {'error': 'Internal server error'}, 
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+def bulk_join_sessions(request):
+    return _bulk_transition(request, SessionStateService.join_sessions)
+
+
+@api_view(['POST'])
+def bulk_end_sessions(request):
+    return _bulk_transition(request, SessionStateService.end_sessions)
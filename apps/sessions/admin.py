@@ -2,7 +2,9 @@
 Admin configuration for sessions
 """
 from django.contrib import admin
-from apps.sessions.models import Session
+from django.http import StreamingHttpResponse
+from apps.sessions.exports import CONTENT_TYPES, export_queryset, iter_rows, stream_export
+from apps.sessions.models import Session, WaitlistEntry
 
 
 @admin.register(Session)
@@ -11,6 +13,7 @@ class SessionAdmin(admin.ModelAdmin):
     list_filter = ['status', 'expert', 'student', 'start_at']
     search_fields = ['expert__name', 'student__name', 'expert__email', 'student__email']
     readonly_fields = ['id', 'created_at', 'updated_at', 'summary']
+    actions = ['export_as_csv', 'export_as_ndjson']
     
     fieldsets = (
         ('Basic Information', {
@@ -26,4 +29,28 @@ class SessionAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+
+    def _export(self, queryset, export_format):
+        rows = iter_rows(export_queryset(queryset=queryset))
+        response = StreamingHttpResponse(
+            stream_export(export_format, rows),
+            content_type=CONTENT_TYPES[export_format]
+        )
+        response['Content-Disposition'] = f'attachment; filename="sessions.{export_format}"'
+        return response
+
+    @admin.action(description="Export selected sessions as CSV")
+    def export_as_csv(self, request, queryset):
+        return self._export(queryset, 'csv')
+
+    @admin.action(description="Export selected sessions as NDJSON")
+    def export_as_ndjson(self, request, queryset):
+        return self._export(queryset, 'ndjson')
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'expert', 'student', 'start_at', 'end_at', 'status', 'created_at']
+    list_filter = ['status', 'expert']
+    readonly_fields = ['id', 'created_at', 'updated_at', 'session']
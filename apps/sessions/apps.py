@@ -3,4 +3,4 @@ from django.apps import AppConfig
 
 class SessionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'sessions'
+    name = 'apps.sessions'
@@ -0,0 +1,92 @@
+"""
+Streaming export of sessions for analytics
+"""
+import csv
+import json
+import uuid
+from typing import Iterable, Iterator, Optional, List
+from django.utils import timezone
+from apps.sessions.models import Session
+
+
+EXPORT_FIELDS = [
+    'id', 'status', 'start_at', 'end_at', 'joined_at', 'ended_at', 'created_at',
+    'expert_id', 'expert__name', 'expert__email', 'expert__specialization',
+    'student_id', 'student__name', 'student__email', 'student__level',
+]
+
+EXPORT_FORMATS = ['csv', 'ndjson']
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(start: Optional[timezone.datetime] = None, end: Optional[timezone.datetime] = None,
+                    statuses: Optional[List[str]] = None, after: Optional[str] = None,
+                    queryset=None):
+    """
+    Build the export query as flat tuples of EXPORT_FIELDS.
+    Rows are ordered by id so `after` (the last exported id) resumes an
+    interrupted export without OFFSET scans.
+    """
+    if queryset is None:
+        queryset = Session.objects.all()
+    if start is not None:
+        queryset = queryset.filter(start_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(start_at__lt=end)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+    if after is not None:
+        queryset = queryset.filter(id__gt=after)
+    return queryset.order_by('id').values_list(*EXPORT_FIELDS)
+
+
+def iter_rows(queryset, chunk_size: int = DEFAULT_CHUNK_SIZE, limit: Optional[int] = None) -> Iterator[tuple]:
+    """Iterate rows with a server-side cursor so memory stays constant"""
+    if limit is not None:
+        queryset = queryset[:limit]
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def _format_value(value):
+    if isinstance(value, timezone.datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def render_csv(rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def render_ndjson(rows: Iterable[tuple]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({
+            field: _format_value(value) for field, value in zip(EXPORT_FIELDS, row)
+        }) + '\n'
+
+
+RENDERERS = {
+    'csv': render_csv,
+    'ndjson': render_ndjson,
+}
+
+
+def stream_export(export_format: str, rows: Iterable[tuple]) -> Iterator[str]:
+    return RENDERERS[export_format](rows)
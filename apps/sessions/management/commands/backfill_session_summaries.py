@@ -0,0 +1,47 @@
+"""
+Enqueue summary generation for completed sessions that have none
+"""
+import time
+from django.core.management.base import BaseCommand
+from apps.sessions.models import Session, SessionStatus
+from apps.sessions.tasks import generate_session_summary, SUMMARY_PRIORITY_BACKFILL
+
+
+class Command(BaseCommand):
+    help = "Enqueue low-priority summary tasks for completed sessions with an empty summary"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--rate', type=float, default=20.0,
+                            help="Maximum tasks enqueued per second")
+        parser.add_argument('--limit', type=int, help="Maximum number of sessions to enqueue")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        limit = options['limit']
+        pending = Session.objects.filter(status=SessionStatus.COMPLETED, summary='').order_by('id')
+
+        enqueued = 0
+        last_id = None
+        while limit is None or enqueued < limit:
+            batch = pending if last_id is None else pending.filter(id__gt=last_id)
+            size = batch_size if limit is None else min(batch_size, limit - enqueued)
+            session_ids = list(batch.values_list('id', flat=True)[:size])
+            if not session_ids:
+                break
+
+            if not options['dry_run']:
+                for session_id in session_ids:
+                    generate_session_summary.apply_async(
+                        args=[str(session_id)], priority=SUMMARY_PRIORITY_BACKFILL
+                    )
+            enqueued += len(session_ids)
+            last_id = session_ids[-1]
+
+            # Throttle so a large backfill does not flood the summaries queue
+            if not options['dry_run'] and options['rate'] > 0:
+                time.sleep(len(session_ids) / options['rate'])
+
+        verb = "Would enqueue" if options['dry_run'] else "Enqueued"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {enqueued} summary tasks"))
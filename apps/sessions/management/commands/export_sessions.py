@@ -0,0 +1,50 @@
+"""
+Export sessions joined with expert and student data as CSV or NDJSON
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+from apps.sessions.exports import (
+    EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, export_queryset, iter_rows, stream_export
+)
+from apps.sessions.models import SessionStatus
+
+
+class Command(BaseCommand):
+    help = "Stream sessions to stdout or a file as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--output', help="File to write to (defaults to stdout)")
+        parser.add_argument('--start', help="Only sessions starting at or after this ISO datetime")
+        parser.add_argument('--end', help="Only sessions starting before this ISO datetime")
+        parser.add_argument('--status', action='append', choices=SessionStatus.values,
+                            help="Only sessions in this status (repeatable)")
+        parser.add_argument('--after', help="Resume after this session id")
+        parser.add_argument('--limit', type=int, help="Maximum number of rows to export")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def _parse_datetime(self, value, name):
+        if value is None:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise CommandError(f"Invalid --{name} datetime: {value}")
+        return parsed
+
+    def handle(self, *args, **options):
+        queryset = export_queryset(
+            start=self._parse_datetime(options['start'], 'start'),
+            end=self._parse_datetime(options['end'], 'end'),
+            statuses=options['status'],
+            after=options['after']
+        )
+        rows = iter_rows(queryset, chunk_size=options['chunk_size'], limit=options['limit'])
+        chunks = stream_export(options['format'], rows)
+
+        if options['output']:
+            with open(options['output'], 'w', newline='') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
@@ -1,7 +1,9 @@
 # models needed for sessions after coaching is booked
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from apps.core.models import TimestampedModel, UUIDModel
+from apps.core.slots import to_end_slot, to_slot
 from apps.users.models import Expert, Student
 
 
@@ -13,21 +15,36 @@ class SessionStatus(models.TextChoices):
     CANCELLED = 'CANCELLED', 'Cancelled'
 
 
+class SessionQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(), so fill the slot keys here
+        objs = list(objs)
+        for session in objs:
+            session.set_slots()
+        return super().bulk_create(objs, *args, **kwargs)
+
+
 class Session(TimestampedModel, UUIDModel):
     expert = models.ForeignKey(Expert, on_delete=models.CASCADE, related_name='sessions')
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='sessions')
     start_at = models.DateTimeField()
     end_at = models.DateTimeField()
+    # Minutes since the epoch, used for idempotency and overlap lookups
+    start_slot = models.IntegerField()
+    end_slot = models.IntegerField()
     status = models.CharField(max_length=20, choices=SessionStatus.choices, default=SessionStatus.BOOKED)
     joined_at = models.DateTimeField(null=True, blank=True)
     ended_at = models.DateTimeField(null=True, blank=True)
     summary = models.TextField(blank=True)
+
+    objects = SessionQuerySet.as_manager()
     
     class Meta:
         db_table = 'sessions'
         indexes = [
-            models.Index(fields=['expert', 'start_at', 'end_at']),
-            models.Index(fields=['student', 'start_at', 'end_at']),
+            models.Index(fields=['expert', 'start_slot', 'end_slot']),
+            models.Index(fields=['student', 'start_slot', 'end_slot']),
+            models.Index(fields=['expert', 'status', 'start_at']),  # next booked slot per expert
             models.Index(fields=['status']),
         ]
         constraints = [
@@ -44,8 +61,13 @@ class Session(TimestampedModel, UUIDModel):
         if self.start_at and self.start_at < timezone.now():
             raise ValidationError("Start time cannot be in the past")
 
+    def set_slots(self):
+        self.start_slot = to_slot(self.start_at)
+        self.end_slot = to_end_slot(self.end_at)
+
     def save(self, *args, **kwargs):
         self.clean()
+        self.set_slots()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -59,4 +81,38 @@ class Session(TimestampedModel, UUIDModel):
 
     @property
     def session_name(self):
-        return f"- @ {self.start_at.strftime('%Y-%m-%d %H:%M UTC')}"
\ No newline at end of file
+        return f"- @ {self.start_at.strftime('%Y-%m-%d %H:%M UTC')}"
+
+
+class WaitlistStatus(models.TextChoices):
+    WAITING = 'WAITING', 'Waiting'
+    PROMOTED = 'PROMOTED', 'Promoted'
+    CANCELLED = 'CANCELLED', 'Cancelled'
+
+
+class WaitlistEntry(TimestampedModel, UUIDModel):
+    expert = models.ForeignKey(Expert, on_delete=models.CASCADE, related_name='waitlist_entries')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='waitlist_entries')
+    start_at = models.DateTimeField()
+    end_at = models.DateTimeField()
+    status = models.CharField(max_length=20, choices=WaitlistStatus.choices, default=WaitlistStatus.WAITING)
+    session = models.OneToOneField(
+        Session, on_delete=models.SET_NULL, null=True, blank=True, related_name='waitlist_entry'
+    )
+
+    class Meta:
+        db_table = 'session_waitlist'
+        indexes = [
+            # FIFO scan of an expert's waiting entries
+            models.Index(fields=['expert', 'status', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['expert', 'student', 'start_at', 'end_at'],
+                condition=models.Q(status='WAITING'),
+                name='unique_waiting_entry'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Waitlist {self.id} - {self.student_id} for {self.expert_id} @ {self.start_at}"
@@ -1,5 +1,8 @@
+from datetime import timedelta
+from django.utils import timezone
 from rest_framework import serializers
-from apps.sessions.models import Session, SessionStatus
+from apps.core.slots import normalize, normalize_end
+from apps.sessions.models import Session, SessionStatus, WaitlistEntry
 from apps.users.models import Expert, Student
 
 
@@ -31,6 +34,16 @@ class SessionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'joined_at', 'ended_at', 'summary', 'created_at', 'updated_at']
 
 
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    expert = ExpertSerializer(read_only=True)
+    student = StudentSerializer(read_only=True)
+    
+    class Meta:
+        model = WaitlistEntry
+        fields = ['id', 'expert', 'student', 'start_at', 'end_at', 'status', 'session', 'created_at']
+        read_only_fields = fields
+
+
 class BookSessionSerializer(serializers.Serializer):
     expert_id = serializers.UUIDField()
     student_id = serializers.UUIDField()
@@ -39,6 +52,10 @@ class BookSessionSerializer(serializers.Serializer):
     
     def validate(self, attrs):
         """Validate booking data"""
+        # Canonical UTC slot so retries with another offset or precision match
+        attrs['start_at'] = normalize(attrs['start_at'])
+        attrs['end_at'] = normalize_end(attrs['end_at'])
+        
         if attrs['start_at'] >= attrs['end_at']:
             raise serializers.ValidationError("End time must be after start time")
         
@@ -48,9 +65,33 @@ class BookSessionSerializer(serializers.Serializer):
         return attrs
 
 
+class BookRecurringSessionSerializer(BookSessionSerializer):
+    interval_days = serializers.IntegerField(min_value=1, max_value=28, default=7)
+    occurrences = serializers.IntegerField(min_value=1, max_value=52)
+    
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        
+        # Longer sessions would make occurrences overlap each other
+        if attrs['end_at'] - attrs['start_at'] > timedelta(days=attrs['interval_days']):
+            raise serializers.ValidationError("Session cannot be longer than the series interval")
+        
+        return attrs
+
+
 class JoinSessionSerializer(serializers.Serializer):
     session_id = serializers.UUIDField()
 
 
 class EndSessionSerializer(serializers.Serializer):
-    session_id = serializers.UUIDField()
\ No newline at end of file
+    session_id = serializers.UUIDField()
+
+
+class CancelSessionSerializer(serializers.Serializer):
+    session_id = serializers.UUIDField()
+
+
+class BulkSessionSerializer(serializers.Serializer):
+    session_ids = serializers.ListField(
+        child=serializers.UUIDField(), min_length=1, max_length=500
+    )
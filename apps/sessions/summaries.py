@@ -0,0 +1,189 @@
+"""
+Pluggable session summary generators
+"""
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import timedelta
+from typing import List
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from apps.sessions.models import Session
+
+
+class SummaryGeneratorUnavailable(Exception):
+    """Raised when the generator's circuit is open after repeated failures"""
+
+    def __init__(self, name: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(f"Summary generator {name} is unavailable")
+
+
+class SummaryTimeout(Exception):
+    """Raised when a generator runs past its time budget"""
+
+
+class SummaryGenerator(ABC):
+    """
+    Base class for summary generators.
+    Work is split into chunks so each finished chunk can be memoized and a
+    retry resumes where the previous attempt stopped.
+    """
+    name = 'base'
+    # Bump to invalidate memoized output after changing the rendering
+    version = 1
+
+    def chunks(self, session: Session) -> List:
+        """Units of work; a single chunk by default"""
+        return [session]
+
+    @abstractmethod
+    def render_chunk(self, session: Session, chunk) -> str:
+        pass
+
+    def combine(self, session: Session, parts: List[str]) -> str:
+        return '\n'.join(parts)
+
+    def content_hash(self, session: Session) -> str:
+        """Hash of everything the summary depends on"""
+        content = '|'.join(str(value) for value in [
+            self.name, self.version, session.id, session.start_at, session.end_at,
+            session.expert.id, session.expert.name, session.student.id, session.student.name,
+        ])
+        return hashlib.sha256(content.encode()).hexdigest()
+
+
+class TemplateSummaryGenerator(SummaryGenerator):
+    """Fixed text summary built from session metadata"""
+    name = 'template'
+
+    def render_chunk(self, session: Session, chunk) -> str:
+        duration_hours = session.duration_minutes // 60
+        duration_minutes = session.duration_minutes % 60
+        duration_str = f"{duration_hours:02d}:{duration_minutes:02d}"
+        
+        return (
+            f"Session {session.id} — {session.session_name}\n"
+            f"Duration: {duration_str}\n"
+            f"Expert: {session.expert.name} (ID {session.expert.id})\n"
+            f"Student: {session.student.name} (ID {session.student.id})"
+        )
+
+
+class HeavySummaryGenerator(TemplateSummaryGenerator):
+    """
+    Local stand-in for a transcript/LLM processor.
+    Processes the session in fixed windows and sleeps per window to mimic
+    a slow model call.
+    """
+    name = 'heavy'
+    chunk_minutes = 15
+
+    def chunks(self, session: Session) -> List:
+        windows = []
+        window_start = session.start_at
+        while window_start < session.end_at:
+            window_end = min(window_start + timedelta(minutes=self.chunk_minutes), session.end_at)
+            windows.append((window_start, window_end))
+            window_start = window_end
+        return windows
+
+    def render_chunk(self, session: Session, chunk) -> str:
+        window_start, window_end = chunk
+        time.sleep(settings.SUMMARY_HEAVY_CHUNK_DELAY)
+        return f"[{window_start:%H:%M}-{window_end:%H:%M}] Notes for {session.student.name}"
+
+    def combine(self, session: Session, parts: List[str]) -> str:
+        header = super().render_chunk(session, None)
+        return '\n'.join([header, 'Transcript notes:'] + parts)
+
+
+class CircuitBreaker:
+    """
+    Failure counter kept in the cache so every worker sees the same state.
+    The circuit opens after `threshold` failures and closes again once the
+    counter expires `reset_timeout` seconds after the last failure.
+    """
+
+    def __init__(self, name: str, threshold: int, reset_timeout: int):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.key = f'summary-circuit:{name}'
+
+    def is_open(self) -> bool:
+        return cache.get(self.key, 0) >= self.threshold
+
+    def record_failure(self):
+        failures = cache.get(self.key, 0) + 1
+        cache.set(self.key, failures, self.reset_timeout)
+
+    def record_success(self):
+        cache.delete(self.key)
+
+
+def get_summary_generator() -> SummaryGenerator:
+    return import_string(settings.SESSION_SUMMARY_GENERATOR)()
+
+
+def _cache_key(generator: SummaryGenerator, digest: str, part) -> str:
+    return f'session-summary:{generator.name}:{digest}:{part}'
+
+
+def _render_chunk(generator: SummaryGenerator, session: Session, chunk, timeout: float) -> str:
+    """
+    Run render_chunk on a worker thread so a chunk stuck inside the generator
+    cannot outlive the budget. Threads cannot be killed, so a timed-out chunk
+    keeps running in the background and its result is discarded.
+    """
+    pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'summary-{generator.name}')
+    try:
+        return pool.submit(generator.render_chunk, session, chunk).result(timeout=timeout)
+    except FutureTimeout:
+        raise SummaryTimeout(f"Summary generator {generator.name} timed out") from None
+    finally:
+        pool.shutdown(wait=False)
+
+
+def render_summary(session: Session, generator: SummaryGenerator) -> str:
+    """
+    Render a summary, reusing memoized output for unchanged sessions.
+    Raises SummaryGeneratorUnavailable while the circuit is open and
+    SummaryTimeout when the generator runs past SUMMARY_GENERATOR_TIMEOUT.
+    """
+    digest = generator.content_hash(session)
+    summary = cache.get(_cache_key(generator, digest, 'full'))
+    if summary is not None:
+        return summary
+
+    breaker = CircuitBreaker(
+        generator.name,
+        threshold=settings.SUMMARY_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout=settings.SUMMARY_CIRCUIT_RESET_TIMEOUT
+    )
+    if breaker.is_open():
+        raise SummaryGeneratorUnavailable(generator.name, breaker.reset_timeout)
+
+    deadline = time.monotonic() + settings.SUMMARY_GENERATOR_TIMEOUT
+    parts = []
+    try:
+        for index, chunk in enumerate(generator.chunks(session)):
+            key = _cache_key(generator, digest, index)
+            part = cache.get(key)
+            if part is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise SummaryTimeout(f"Summary generator {generator.name} timed out")
+                part = _render_chunk(generator, session, chunk, remaining)
+                cache.set(key, part, settings.SUMMARY_CACHE_TIMEOUT)
+            parts.append(part)
+        summary = generator.combine(session, parts)
+    except Exception:
+        breaker.record_failure()
+        raise
+
+    breaker.record_success()
+    cache.set(_cache_key(generator, digest, 'full'), summary, settings.SUMMARY_CACHE_TIMEOUT)
+    return summary
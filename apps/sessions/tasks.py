@@ -1,39 +1,67 @@
 
-from celery import shared_task
+import random
+from celery import group, shared_task
+# Configure the project Celery app before shared_task binds to it
+import coaching_sessions.celery  # noqa: F401
+from django.conf import settings
 from django.utils import timezone
+from apps.core.tracing import extract_from_task, inject, start_span, trace_queries
 from apps.sessions.models import Session
+from apps.sessions.summaries import get_summary_generator, render_summary, SummaryGeneratorUnavailable
 
+# Redis serves priority 0 first: freshly ended sessions go ahead of backfills
+SUMMARY_PRIORITY_REALTIME = 0
+SUMMARY_PRIORITY_BACKFILL = 9
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+
+def retry_countdown(retries: int) -> float:
+    """Exponential backoff with full jitter so retries after a DB blip spread out"""
+    ceiling = min(settings.SUMMARY_RETRY_MAX_DELAY, settings.SUMMARY_RETRY_BASE_DELAY * 2 ** retries)
+    return random.uniform(0, ceiling)
+
+
+# acks_late re-delivers the task if the worker dies mid-run, so writes must be idempotent
+@shared_task(bind=True, max_retries=3, acks_late=True, reject_on_worker_lost=True)
 def generate_session_summary(self, session_id: str):
-    try:
-        session = Session.objects.get(id=session_id)
-        
-        # Generate summary
-        duration_hours = session.duration_minutes // 60
-        duration_minutes = session.duration_minutes % 60
-        duration_str = f"{duration_hours:02d}:{duration_minutes:02d}"
-        
-        summary = (
-            f"Session {session.id} — {session.session_name}\n"
-            f"Duration: {duration_str}\n"
-            f"Expert: {session.expert.name} (ID {session.expert.id})\n"
-            f"Student: {session.student.name} (ID {session.student.id})"
-        )
-        
-        #Update session with summary
-        session.summary = summary
-        session.save(update_fields=['summary'])
-        
-        return f"Summary generated for session {session_id}"
-        
-    except Session.DoesNotExist:
-        # Session doesn't exist, retry might not help
-        return f"Session {session_id} not found"
-    except Exception as exc:
-        # Retry on transient errors
-        if self.request.retries < self.max_retries:
-            raise self.retry(exc=exc)
-        else:
-            # Log final failure
-            return f"Failed to generate summary for session {session_id} after {self.max_retries} retries"
\ No newline at end of file
+    parent = extract_from_task(self.request)
+    with start_span('celery.task generate_session_summary', {'session.id': session_id}, parent=parent), \
+            trace_queries():
+        try:
+            session = Session.objects.select_related('expert', 'student').get(id=session_id)
+            
+            if session.summary:
+                return f"Summary already generated for session {session_id}"
+            
+            generator = get_summary_generator()
+            summary = render_summary(session, generator)
+            
+            # Only fill an empty summary so a re-delivered task cannot overwrite one
+            Session.objects.filter(id=session_id, summary='').update(summary=summary)
+            
+            return f"Summary generated for session {session_id}"
+            
+        except Session.DoesNotExist:
+            # Session doesn't exist, retry might not help
+            return f"Session {session_id} not found"
+        except SummaryGeneratorUnavailable as exc:
+            # Circuit is open; come back once it may have closed
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=exc, countdown=exc.retry_after + retry_countdown(0))
+            return f"Summary generator unavailable for session {session_id}"
+        except Exception as exc:
+            # Retry on transient errors
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=exc, countdown=retry_countdown(self.request.retries))
+            else:
+                # Log final failure
+                return f"Failed to generate summary for session {session_id} after {self.max_retries} retries"
+
+
+def enqueue_summaries(session_ids, priority: int = SUMMARY_PRIORITY_REALTIME):
+    """Publish summary tasks for many sessions over a single producer connection"""
+    with start_span('celery.publish generate_session_summary', {'session.count': len(session_ids)}):
+        headers = inject()
+        group(
+            generate_session_summary.si(str(session_id)).set(priority=priority, headers=headers)
+            for session_id in session_ids
+        ).apply_async()
@@ -5,6 +5,11 @@ app_name = 'sessions'
 
 urlpatterns = [
     path('book/', views.book_session, name='book_session'),
+    path('book/recurring/', views.book_recurring_session, name='book_recurring_session'),
     path('join/', views.join_session, name='join_session'),
+    path('join/bulk/', views.bulk_join_sessions, name='bulk_join_sessions'),
     path('end/', views.end_session, name='end_session'),
+    path('end/bulk/', views.bulk_end_sessions, name='bulk_end_sessions'),
+    path('cancel/', views.cancel_session, name='cancel_session'),
+    path('waitlist/', views.join_waitlist, name='join_waitlist'),
 ]
\ No newline at end of file
@@ -1,3 +1,5 @@
-from django.shortcuts import render
-
-# Create your views here.
+# Session endpoints are implemented in apps.core.views
+from apps.core.views import (
+    book_session, book_recurring_session, join_session, end_session,
+    bulk_join_sessions, bulk_end_sessions, cancel_session, join_waitlist
+)
@@ -0,0 +1,21 @@
+"""
+Recompute ExpertStats from the sessions table
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.core.services import ExpertStatsService
+
+
+class Command(BaseCommand):
+    # Bookings nobody joined only count as no-shows once rebuilt, so run this periodically
+    help = "Rebuild per-expert session statistics in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--expert', action='append', dest='experts',
+                            help="Only rebuild this expert id (repeatable)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = ExpertStatsService.rebuild(options['experts'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {count} experts"))
@@ -19,4 +19,34 @@ class Student(BaseUser):
     level = models.CharField(max_length=50, default='beginner')
 
     class Meta:
-        db_table = 'students'
\ No newline at end of file
+        db_table = 'students'
+
+
+class ExpertStats(models.Model):
+    """Per-expert session statistics, kept current incrementally"""
+    expert = models.OneToOneField(Expert, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    total_sessions = models.PositiveIntegerField(default=0)
+    completed_sessions = models.PositiveIntegerField(default=0)
+    completed_minutes = models.PositiveIntegerField(default=0)
+    no_show_sessions = models.PositiveIntegerField(default=0)
+    next_booked_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'expert_stats'
+        verbose_name_plural = 'expert stats'
+        indexes = [
+            models.Index(fields=['-completed_sessions']),
+            models.Index(fields=['-completed_minutes']),
+        ] # leaderboards order by these
+
+    def __str__(self):
+        return f"Stats for {self.expert_id}"
+
+    @property
+    def no_show_rate(self):
+        # Out of sessions whose time has come: held or missed, not future or cancelled early
+        due = self.completed_sessions + self.no_show_sessions
+        if due:
+            return self.no_show_sessions / due
+        return 0.0
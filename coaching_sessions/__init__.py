@@ -1,5 +1,12 @@
-# This will make sure the app is always imported when
-# Django starts so that shared_task will use this app.
-from .celery import app as celery_app
+# The Celery app is loaded on first use rather than when Django starts:
+# importing celery and kombu is a large part of cold-start time, and web
+# processes only need it once they publish a task. Task modules import
+# coaching_sessions.celery themselves so shared_task binds to this app.
+__all__ = ('celery_app',)
 
-__all__ = ('celery_app',)
\ No newline at end of file
+
+def __getattr__(name):
+    if name == 'celery_app':
+        from .celery import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.tracing.TracingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,6 +85,13 @@ DATABASES = {
     }
 }
 
+# Store UUID primary keys as 16 bytes on SQLite (PostgreSQL always uses native uuid)
+# Must match the existing key columns: connections refuse to start when it doesn't
+COMPACT_UUID_KEYS = os.getenv('COMPACT_UUID_KEYS', 'false').lower() == 'true'
+
+# Booking times are stored in UTC on this many minutes: starts round down, ends round up
+SESSION_SLOT_GRANULARITY_MINUTES = int(os.getenv('SESSION_SLOT_GRANULARITY_MINUTES', '1'))
+
 # Celery Configuration
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
@@ -91,6 +100,67 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Summary generation gets its own queue so it never waits behind other work.
+# Run it with: celery -A coaching_sessions worker -Q summaries
+SUMMARY_QUEUE = os.getenv('SUMMARY_QUEUE', 'summaries')
+CELERY_TASK_ROUTES = {
+    'apps.sessions.tasks.generate_session_summary': {'queue': SUMMARY_QUEUE},
+}
+# Redis emulates priorities with sub-queues; 0 is served first
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    'priority_steps': list(range(10)),
+    'queue_order_strategy': 'priority',
+    'sep': ':',
+}
+# Long-running tasks with acks_late should not be hoarded by one worker
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv('CELERY_WORKER_PREFETCH_MULTIPLIER', '1'))
+CELERY_WORKER_CONCURRENCY = int(os.getenv('CELERY_WORKER_CONCURRENCY', '4'))
+
+# Retry backoff for summary generation, in seconds (full jitter is applied)
+SUMMARY_RETRY_BASE_DELAY = int(os.getenv('SUMMARY_RETRY_BASE_DELAY', '30'))
+SUMMARY_RETRY_MAX_DELAY = int(os.getenv('SUMMARY_RETRY_MAX_DELAY', '600'))
+
+# Summary generator (dotted path to a SummaryGenerator subclass)
+SESSION_SUMMARY_GENERATOR = os.getenv(
+    'SESSION_SUMMARY_GENERATOR', 'apps.sessions.summaries.TemplateSummaryGenerator'
+)
+# Seconds per summary, enforced inside each chunk as well as between them
+SUMMARY_GENERATOR_TIMEOUT = int(os.getenv('SUMMARY_GENERATOR_TIMEOUT', '300'))
+SUMMARY_CACHE_TIMEOUT = int(os.getenv('SUMMARY_CACHE_TIMEOUT', '86400'))
+SUMMARY_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('SUMMARY_CIRCUIT_FAILURE_THRESHOLD', '5'))
+SUMMARY_CIRCUIT_RESET_TIMEOUT = int(os.getenv('SUMMARY_CIRCUIT_RESET_TIMEOUT', '120'))
+SUMMARY_HEAVY_CHUNK_DELAY = float(os.getenv('SUMMARY_HEAVY_CHUNK_DELAY', '1'))
+# Backstop on the prefork pool in case the chunk timeout itself is bypassed
+CELERY_TASK_ANNOTATIONS = {
+    'apps.sessions.tasks.generate_session_summary': {'soft_time_limit': SUMMARY_GENERATOR_TIMEOUT + 60},
+}
+
+# Memoized summaries and circuit state must be shared by all workers to help retries
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['CACHE_URL'],
+    } if os.getenv('CACHE_URL') else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Booking rate limits: token buckets of `capacity` tokens refilled at `per_second`
+BOOKING_RATE_LIMITS = {
+    'student': {'capacity': 5, 'per_second': 0.2},
+    'expert': {'capacity': 50, 'per_second': 5},
+    'global': {'capacity': 500, 'per_second': 200},
+}
+# 'local' keeps counters per process; 'cache' shares them through CACHES
+BOOKING_RATE_LIMIT_BACKEND = os.getenv('BOOKING_RATE_LIMIT_BACKEND', 'local')
+# Reject bookings early while average DB query latency is above this
+BOOKING_SHED_LATENCY_MS = float(os.getenv('BOOKING_SHED_LATENCY_MS', '250'))
+BOOKING_SHED_HALF_LIFE = float(os.getenv('BOOKING_SHED_HALF_LIFE', '5'))
+
+# Tracing: spans for requests, service calls, SQL queries and Celery tasks
+TRACING_ENABLED = os.getenv('TRACING_ENABLED', 'false').lower() == 'true'
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'apps.core.tracing.LoggingSpanExporter')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [],
     'DEFAULT_PERMISSION_CLASSES': [],
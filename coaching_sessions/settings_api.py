@@ -0,0 +1,48 @@
+"""
+Lean settings profile for API-only web pods.
+
+The API uses no auth, sessions, messages, admin or static files, so those
+apps and their middleware are left out to cut startup time. Select it with
+DJANGO_SETTINGS_MODULE=coaching_sessions.settings_api.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+API_EXCLUDED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in API_EXCLUDED_APPS]
+
+MIDDLEWARE = [
+    'apps.core.tracing.TracingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'coaching_sessions.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+AUTH_PASSWORD_VALIDATORS = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    # Keep DRF from importing django.contrib.auth for AnonymousUser
+    'UNAUTHENTICATED_USER': None,
+}
@@ -0,0 +1,79 @@
+"""
+Benchmark primary key layouts: hex text vs binary, uuid4 vs uuid7.
+
+Inserts rows into a sessions-shaped SQLite table and reports insert
+throughput (overall and for the last batch, to show slowdown as the table
+grows) plus the size of the primary key index.
+
+    python tests/benchmark_uuid_keys.py --rows 200000
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from apps.core.uuids import uuid7
+
+
+VARIANTS = {
+    'text/uuid4': ('char(32)', lambda: uuid.uuid4().hex),
+    'text/uuid7': ('char(32)', lambda: uuid7().hex),
+    'blob/uuid4': ('blob', lambda: uuid.uuid4().bytes),
+    'blob/uuid7': ('blob', lambda: uuid7().bytes),
+}
+
+
+def run_variant(path, column_type, make_key, rows, batch_size):
+    connection = sqlite3.connect(path)
+    connection.execute(
+        f"CREATE TABLE sessions (id {column_type} NOT NULL PRIMARY KEY, "
+        f"expert_id {column_type} NOT NULL, start_at datetime NOT NULL)"
+    )
+    expert_id = make_key()
+
+    started = time.perf_counter()
+    last_batch_seconds = 0.0
+    for offset in range(0, rows, batch_size):
+        batch = [(make_key(), expert_id, '2026-01-01 00:00:00') for _ in range(min(batch_size, rows - offset))]
+        batch_started = time.perf_counter()
+        connection.executemany("INSERT INTO sessions VALUES (?, ?, ?)", batch)
+        connection.commit()
+        last_batch_seconds = time.perf_counter() - batch_started
+    elapsed = time.perf_counter() - started
+
+    index_bytes, = connection.execute(
+        "SELECT SUM(pgsize) FROM dbstat WHERE name = 'sqlite_autoindex_sessions_1'"
+    ).fetchone()
+    connection.close()
+    return {
+        'rows_per_second': rows / elapsed,
+        'last_batch_rows_per_second': batch_size / last_batch_seconds,
+        'index_mb': index_bytes / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'variant':<12} {'rows/s':>10} {'last batch rows/s':>18} {'pk index MB':>12}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, (column_type, make_key) in VARIANTS.items():
+            path = os.path.join(directory, name.replace('/', '_') + '.sqlite3')
+            result = run_variant(path, column_type, make_key, args.rows, args.batch_size)
+            print(
+                f"{name:<12} {result['rows_per_second']:>10.0f} "
+                f"{result['last_batch_rows_per_second']:>18.0f} {result['index_mb']:>12.2f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,43 @@
 """
 Tests for session functionality
 """
-from django.test import TestCase
+from django.test import TestCase, SimpleTestCase
 from django.utils import timezone
-from datetime import timedelta
-from apps.sessions.models import Session, SessionStatus
-from apps.users.models import Expert, Student
+from datetime import datetime, timedelta, timezone as dt_timezone
+from apps.sessions.models import Session, SessionStatus, WaitlistEntry, WaitlistStatus
+from apps.users.models import Expert, ExpertStats, Student
+from apps.core.services import (
+    ExpertStatsService, SessionDoubleBookingValidator, SessionIdempotencyService, SessionStateService
+)
+from apps.core.importtime import measure, parse_importtime
+from apps.core.checks import verify_uuid_key_storage
+from apps.core.fields import CompactUUIDField
+from apps.core.slots import normalize, normalize_end, to_slot
+from apps.core.uuids import uuid7
+from apps.core import ratelimit, tracing
+from django.db import connection
+from django.db.backends.signals import connection_created
+import uuid
 from apps.sessions.views import book_session, join_session, end_session
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
+from django.apps import AppConfig
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework.test import APIClient
+from django.core.management import call_command
+from unittest import mock
+from io import StringIO
+from apps.sessions.tasks import generate_session_summary
+from apps.sessions.summaries import (
+    HeavySummaryGenerator, render_summary, SummaryGeneratorUnavailable, SummaryTimeout
+)
 import json
+import os
+import statistics
+import threading
+import time
+from pathlib import Path
 
 
 class SessionTestCase(TestCase):
@@ -91,8 +119,143 @@ class BookSessionTestCase(SessionTestCase):
         response = self.client.post('/api/sessions/book/', data, format='json')
         
         self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflict'], 'expert')
         self.assertEqual(Session.objects.count(), 1)  # Only first session exists
     
+    def test_booking_normalizes_to_utc_slot(self):
+        """Test booked times are stored in UTC, widened to whole slots"""
+        start = datetime(2030, 1, 7, 17, 0, 42, 123456, tzinfo=dt_timezone(timedelta(hours=5, minutes=30)))
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': start.isoformat(),
+            'end_at': (start + timedelta(hours=1)).isoformat()
+        }
+        
+        response = self.client.post('/api/sessions/book/', data, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        session = Session.objects.get()
+        self.assertEqual(session.start_at, datetime(2030, 1, 7, 11, 30, tzinfo=dt_timezone.utc))
+        self.assertEqual(session.start_slot, to_slot(session.start_at))
+        # 17:00:42 to 18:00:42 covers parts of 61 minutes
+        self.assertEqual(session.end_slot - session.start_slot, 61)
+    
+    @override_settings(SESSION_SLOT_GRANULARITY_MINUTES=15)
+    def test_coarse_granularity_covers_requested_window(self):
+        """Test starts round down and ends round up to the slot granularity"""
+        start = datetime(2030, 1, 7, 17, 0, tzinfo=dt_timezone.utc)
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': (start + timedelta(minutes=5)).isoformat(),
+            'end_at': (start + timedelta(minutes=50)).isoformat()
+        }
+        
+        response = self.client.post('/api/sessions/book/', data, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        session = Session.objects.get()
+        self.assertEqual(session.start_at, start)
+        self.assertEqual(session.end_at, start + timedelta(hours=1))
+        
+        # A window shorter than one slot still gets a whole slot
+        data['student_id'] = str(self.student2.id)
+        data['start_at'] = (start + timedelta(days=1)).isoformat()
+        data['end_at'] = (start + timedelta(days=1, minutes=10)).isoformat()
+        response = self.client.post('/api/sessions/book/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['duration_minutes'], 15)
+    
+    def test_sub_minute_end_still_overlaps(self):
+        """Test a session ending mid-minute blocks that minute"""
+        start = normalize(self.start_time)
+        Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=start,
+            end_at=start + timedelta(minutes=30, seconds=40)
+        )
+        
+        response = self.client.post('/api/sessions/book/', {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student2.id),
+            'start_at': (start + timedelta(minutes=30)).isoformat(),
+            'end_at': (start + timedelta(hours=1)).isoformat()
+        }, format='json')
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Session.objects.count(), 1)
+    
+    def test_idempotent_across_offsets_and_precision(self):
+        """Test the same slot sent with another offset and seconds is not duplicated"""
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': self.end_time.isoformat()
+        }
+        first = self.client.post('/api/sessions/book/', data, format='json')
+        
+        offset = dt_timezone(timedelta(hours=-8))
+        data['start_at'] = normalize(self.start_time).astimezone(offset).replace(second=30).isoformat()
+        data['end_at'] = normalize_end(self.end_time).astimezone(offset).isoformat()
+        second = self.client.post('/api/sessions/book/', data, format='json')
+        
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertEqual(Session.objects.count(), 1)
+    
+    def test_same_pair_overlap_rejection(self):
+        """Test the same student cannot hold two overlapping slots with one expert"""
+        Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.BOOKED
+        )
+        
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.overlap_start.isoformat(),
+            'end_at': self.overlap_end.isoformat()
+        }
+        
+        response = self.client.post('/api/sessions/book/', data, format='json')
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Session.objects.count(), 1)
+    
+    def test_student_double_booking_rejection(self):
+        """Test that a student cannot book two experts at the same time"""
+        other_expert = Expert.objects.create(
+            name="Other Expert",
+            email="other.expert@test.com"
+        )
+        Session.objects.create(
+            expert=other_expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.BOOKED
+        )
+        
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.overlap_start.isoformat(),
+            'end_at': self.overlap_end.isoformat()
+        }
+        
+        response = self.client.post('/api/sessions/book/', data, format='json')
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflict'], 'student')
+        self.assertEqual(Session.objects.count(), 1)
+    
     def test_idempotent_booking(self):
         """Test that same student can book same slot multiple times"""
         data = {
@@ -161,4 +324,1017 @@ class SessionFlowTestCase(SessionTestCase):
         self.session.refresh_from_db()
         self.assertEqual(self.session.status, SessionStatus.COMPLETED)
         self.assertIsNotNone(self.session.ended_at)
-        
\ No newline at end of file
+        
+
+class RecurringBookingTestCase(SessionTestCase):
+    """Test booking recurring session series"""
+    
+    def test_weekly_series_booking(self):
+        """Test that every occurrence of a free series is booked"""
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': self.end_time.isoformat(),
+            'occurrences': 4
+        }
+        
+        response = self.client.post('/api/sessions/book/recurring/', data, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Session.objects.count(), 4)
+        self.assertEqual(response.data['conflicts'], [])
+        
+        starts = sorted(Session.objects.values_list('start_at', flat=True))
+        self.assertEqual(starts[1] - starts[0], timedelta(days=7))
+    
+    def test_series_reports_conflicts(self):
+        """Test that conflicting occurrences are skipped and reported"""
+        # Another student already holds the third week
+        Session.objects.create(
+            expert=self.expert,
+            student=self.student2,
+            start_at=self.overlap_start + timedelta(weeks=2),
+            end_at=self.overlap_end + timedelta(weeks=2),
+            status=SessionStatus.BOOKED
+        )
+        
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': self.end_time.isoformat(),
+            'occurrences': 4
+        }
+        
+        response = self.client.post('/api/sessions/book/recurring/', data, format='json')
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['sessions']), 3)
+        self.assertEqual(len(response.data['conflicts']), 1)
+        self.assertEqual(Session.objects.filter(student=self.student1).count(), 3)
+        
+        # Re-sending the series is idempotent
+        response = self.client.post('/api/sessions/book/recurring/', data, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Session.objects.filter(student=self.student1).count(), 3)
+    
+    def test_series_longer_than_interval_rejected(self):
+        """Test a session longer than the interval cannot overlap its own series"""
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': (self.start_time + timedelta(days=3)).isoformat(),
+            'interval_days': 1,
+            'occurrences': 3
+        }
+        
+        response = self.client.post('/api/sessions/book/recurring/', data, format='json')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Session.objects.count(), 0)
+    
+    def test_unknown_expert_is_not_found(self):
+        """Test an unknown expert returns 404 rather than 500"""
+        data = {
+            'expert_id': str(uuid.uuid4()),
+            'student_id': str(self.student1.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': self.end_time.isoformat(),
+            'occurrences': 2
+        }
+        
+        response = self.client.post('/api/sessions/book/recurring/', data, format='json')
+        
+        self.assertEqual(response.status_code, 404)
+
+
+class ExportSessionsTestCase(SessionTestCase):
+    """Test streaming session exports"""
+    
+    def setUp(self):
+        super().setUp()
+        self.sessions = [
+            Session.objects.create(
+                expert=self.expert,
+                student=student,
+                start_at=self.start_time + timedelta(days=day),
+                end_at=self.end_time + timedelta(days=day),
+                status=SessionStatus.BOOKED
+            )
+            for day, student in enumerate([self.student1, self.student2, self.student1])
+        ]
+    
+    def _export(self, *args):
+        out = StringIO()
+        call_command('export_sessions', *args, stdout=out)
+        return out.getvalue()
+    
+    def test_export_has_no_http_route(self):
+        """Test the bulk dump of names and emails is not reachable over the API"""
+        self.assertEqual(self.client.get('/api/sessions/export/').status_code, 404)
+    
+    def test_csv_export(self):
+        """Test CSV export streams a header and one row per session"""
+        lines = self._export().splitlines()
+        
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('id,status'))
+    
+    def test_ndjson_export_resumes_after_cursor(self):
+        """Test NDJSON export filters and resumes from the last exported id"""
+        rows = [json.loads(line) for line in self._export('--format', 'ndjson', '--limit', '2').splitlines()]
+        self.assertEqual(len(rows), 2)
+        
+        rest = [json.loads(line) for line in self._export('--format', 'ndjson', '--after', rows[-1]['id']).splitlines()]
+        self.assertEqual(len(rest), 1)
+        self.assertEqual(
+            {row['id'] for row in rows + rest},
+            {str(session.id) for session in self.sessions}
+        )
+        self.assertEqual(rest[0]['expert__name'], self.expert.name)
+
+
+
+class ExpertStatsTestCase(SessionTestCase):
+    """Test incremental expert statistics"""
+    
+    def test_stats_follow_session_flow(self):
+        """Test booking, joining and ending keep stats current"""
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': normalize(self.start_time).isoformat(),
+            'end_at': normalize(self.end_time).isoformat()
+        }
+        response = self.client.post('/api/sessions/book/', data, format='json')
+        
+        stats = ExpertStats.objects.get(expert=self.expert)
+        self.assertEqual(stats.total_sessions, 1)
+        self.assertEqual(stats.next_booked_at, normalize(self.start_time))
+        
+        self.client.post('/api/sessions/join/', {'session_id': response.data['id']}, format='json')
+        self.client.post('/api/sessions/end/', {'session_id': response.data['id']}, format='json')
+        
+        stats.refresh_from_db()
+        self.assertEqual(stats.completed_sessions, 1)
+        self.assertEqual(stats.completed_minutes, 60)
+        self.assertIsNone(stats.next_booked_at)
+    
+    def test_rebuild_matches_sessions(self):
+        """Test rebuilding recomputes stats from the sessions table"""
+        Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.BOOKED
+        )
+        
+        self.assertEqual(ExpertStatsService.rebuild(), 1)
+        
+        stats = ExpertStats.objects.get(expert=self.expert)
+        self.assertEqual(stats.total_sessions, 1)
+        self.assertEqual(stats.completed_sessions, 0)
+        self.assertEqual(stats.no_show_rate, 0.0)
+        self.assertEqual(stats.next_booked_at, self.start_time)
+    
+    def test_rebuild_counts_unjoined_past_bookings_as_no_shows(self):
+        """Test a booking left BOOKED past its end is a no-show, and only due sessions count"""
+        past = self.now - timedelta(days=2)
+        Session.objects.bulk_create([
+            Session(expert=self.expert, student=self.student1, start_at=past,
+                    end_at=past + timedelta(hours=1)),
+            Session(expert=self.expert, student=self.student2, start_at=past + timedelta(hours=2),
+                    end_at=past + timedelta(hours=3), status=SessionStatus.COMPLETED),
+            Session(expert=self.expert, student=self.student1, start_at=self.start_time,
+                    end_at=self.end_time),
+        ])
+        
+        ExpertStatsService.rebuild()
+        
+        stats = ExpertStats.objects.get(expert=self.expert)
+        self.assertEqual(stats.no_show_sessions, 1)
+        self.assertEqual(stats.no_show_rate, 0.5)
+    
+    def test_rebuild_command_for_one_expert(self):
+        """Test --expert with a string id rebuilds that expert's real counts"""
+        Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.BOOKED
+        )
+        
+        out = StringIO()
+        call_command('rebuild_expert_stats', '--expert', str(self.expert.id), stdout=out)
+        
+        self.assertIn("Rebuilt stats for 1 experts", out.getvalue())
+        stats = ExpertStats.objects.get(expert=self.expert)
+        self.assertEqual(stats.total_sessions, 1)
+        self.assertEqual(stats.next_booked_at, self.start_time)
+    
+    def test_next_booked_skips_stale_bookings(self):
+        """Test a past booking that was never joined is not the next slot"""
+        Session.objects.bulk_create([Session(
+            expert=self.expert,
+            student=self.student2,
+            start_at=self.now - timedelta(days=3),
+            end_at=self.now - timedelta(days=3) + timedelta(hours=1)
+        )])
+        ExpertStatsService.rebuild()
+        self.assertIsNone(ExpertStats.objects.get(expert=self.expert).next_booked_at)
+        # As recorded back when the stale booking was still upcoming
+        ExpertStats.objects.filter(expert=self.expert).update(next_booked_at=self.now - timedelta(days=3))
+        
+        start = normalize(self.now + timedelta(days=2))
+        self.client.post('/api/sessions/book/', {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': start.isoformat(),
+            'end_at': (start + timedelta(hours=1)).isoformat()
+        }, format='json')
+        
+        self.assertEqual(ExpertStats.objects.get(expert=self.expert).next_booked_at, start)
+        ExpertStatsService.rebuild()
+        self.assertEqual(ExpertStats.objects.get(expert=self.expert).next_booked_at, start)
+
+
+
+class SummaryTaskTestCase(SessionTestCase):
+    """Test summary generation task and backfill"""
+    
+    def setUp(self):
+        super().setUp()
+        self.session = Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.COMPLETED
+        )
+    
+    def test_summary_is_written_once(self):
+        """Test a re-delivered task does not overwrite an existing summary"""
+        generate_session_summary(str(self.session.id))
+        self.session.refresh_from_db()
+        self.assertIn(self.expert.name, self.session.summary)
+        
+        Session.objects.filter(id=self.session.id).update(summary='edited')
+        result = generate_session_summary(str(self.session.id))
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.summary, 'edited')
+        self.assertIn('already generated', result)
+    
+    def test_backfill_enqueues_missing_summaries(self):
+        """Test backfill enqueues only completed sessions without a summary"""
+        Session.objects.create(
+            expert=self.expert,
+            student=self.student2,
+            start_at=self.start_time + timedelta(days=1),
+            end_at=self.end_time + timedelta(days=1),
+            status=SessionStatus.COMPLETED,
+            summary='done'
+        )
+        
+        with mock.patch.object(generate_session_summary, 'apply_async') as apply_async:
+            call_command('backfill_session_summaries', rate=0, stdout=StringIO())
+        
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs['args'], [str(self.session.id)])
+
+
+
+@override_settings(SUMMARY_HEAVY_CHUNK_DELAY=0, SUMMARY_CIRCUIT_FAILURE_THRESHOLD=2)
+class SummaryGeneratorTestCase(SessionTestCase):
+    """Test memoized, chunked summary generators"""
+    
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.session = Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.COMPLETED
+        )
+        self.generator = HeavySummaryGenerator()
+        self.render_chunk = self.generator.render_chunk
+    
+    def test_retry_resumes_from_memoized_chunks(self):
+        """Test chunks finished before a failure are not rendered again"""
+        calls = []
+        
+        def flaky_render_chunk(session, chunk):
+            calls.append(chunk)
+            if len(calls) == 3:
+                raise RuntimeError("model timeout")
+            return self.render_chunk(session, chunk)
+        
+        with mock.patch.object(self.generator, 'render_chunk', side_effect=flaky_render_chunk):
+            with self.assertRaises(RuntimeError):
+                render_summary(self.session, self.generator)
+            summary = render_summary(self.session, self.generator)
+            # Re-running an unchanged session is served from the cache
+            self.assertEqual(render_summary(self.session, self.generator), summary)
+        
+        # 4 chunks of 15 minutes, plus the one retried after the failure
+        self.assertEqual(len(calls), 5)
+        self.assertIn('Transcript notes:', summary)
+    
+    def test_circuit_opens_after_repeated_failures(self):
+        """Test the generator is short-circuited after the failure threshold"""
+        with mock.patch.object(self.generator, 'render_chunk', side_effect=RuntimeError):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    render_summary(self.session, self.generator)
+            with self.assertRaises(SummaryGeneratorUnavailable):
+                render_summary(self.session, self.generator)
+    
+    @override_settings(SUMMARY_GENERATOR_TIMEOUT=0.2)
+    def test_stuck_chunk_times_out(self):
+        """Test the budget is enforced inside a chunk, not only between chunks"""
+        stuck = threading.Event()
+        self.addCleanup(stuck.set)
+        
+        def stuck_render_chunk(session, chunk):
+            stuck.wait(5)
+            return ''
+        
+        started = time.monotonic()
+        with mock.patch.object(self.generator, 'render_chunk', side_effect=stuck_render_chunk):
+            with self.assertRaises(SummaryTimeout):
+                render_summary(self.session, self.generator)
+        self.assertLess(time.monotonic() - started, 2)
+
+
+
+class ImportTimeTestCase(SimpleTestCase):
+    """Test the cold-start import report"""
+    
+    def test_parse_importtime(self):
+        """Test parsing of `python -X importtime` output"""
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     _json\n"
+            "import time:       800 |       1500 |   json.decoder\n"
+            "import time:      1000 |       2600 | json\n"
+        )
+        
+        timings = parse_importtime(output)
+        
+        self.assertEqual([timing.module for timing in timings], ['_json', 'json.decoder', 'json'])
+        self.assertEqual(timings[2].cumulative_us, 2600)
+        self.assertEqual([timing.depth for timing in timings], [2, 1, 0])
+    
+    def test_measure_runs_fresh_interpreter(self):
+        """Test measuring an import in a subprocess"""
+        report = measure('import json', runs=1)
+        
+        self.assertIn('json', [timing.module for timing in report.timings])
+        self.assertGreater(report.total_ms, 0)
+    
+    def test_api_profile_is_lean(self):
+        """Test the api-only profile drops unused contrib apps and admin URLs"""
+        from coaching_sessions import settings_api
+        
+        self.assertNotIn('django.contrib.admin', settings_api.INSTALLED_APPS)
+        self.assertNotIn('django.contrib.auth', settings_api.INSTALLED_APPS)
+        self.assertEqual(settings_api.ROOT_URLCONF, 'coaching_sessions.urls_api')
+
+
+
+class UUIDKeyTestCase(SimpleTestCase):
+    """Test time-ordered and compact UUID keys"""
+    
+    def test_uuid7_is_time_ordered(self):
+        """Test uuid7 keys are valid version 7 UUIDs that sort by creation time"""
+        keys = []
+        for _ in range(50):
+            keys.append(uuid7())
+            time.sleep(0.001)
+        
+        self.assertEqual({key.version for key in keys}, {7})
+        self.assertEqual({key.variant for key in keys}, {uuid.RFC_4122})
+        self.assertEqual(sorted(keys), keys)
+    
+    def test_compact_field_round_trip(self):
+        """Test compact keys survive a trip to the database representation"""
+        field = CompactUUIDField()
+        key = uuid7()
+        
+        stored = field.get_db_prep_value(str(key), connection)
+        
+        if connection.features.has_native_uuid_field:
+            self.assertEqual(stored, key)
+        else:
+            self.assertEqual(stored, key.bytes)
+        self.assertEqual(field.from_db_value(stored, None, connection), key)
+
+
+@mock.patch('apps.core.checks._verified_aliases', set())
+class UUIDKeyStorageCheckTestCase(TestCase):
+    """Test the startup guard for COMPACT_UUID_KEYS"""
+    
+    def test_matching_storage_passes(self):
+        """Test the tables created for the current setting are accepted"""
+        verify_uuid_key_storage(None, connection)
+    
+    def test_flipped_setting_refuses_to_run(self):
+        """Test flipping the flag over existing tables raises instead of missing lookups"""
+        if connection.features.has_native_uuid_field:
+            self.skipTest("native uuid columns are the same either way")
+        
+        with override_settings(COMPACT_UUID_KEYS=not settings.COMPACT_UUID_KEYS):
+            with self.assertRaises(ImproperlyConfigured):
+                verify_uuid_key_storage(None, connection)
+    
+    def test_app_config_connects_the_guard(self):
+        """Test apps.core installs and its ready() hooks the guard onto new connections"""
+        if connection.features.has_native_uuid_field:
+            self.skipTest("native uuid columns are the same either way")
+        
+        AppConfig.create('apps.core').ready()
+        self.addCleanup(connection_created.disconnect, dispatch_uid='verify_uuid_key_storage')
+        
+        with override_settings(COMPACT_UUID_KEYS=not settings.COMPACT_UUID_KEYS):
+            with self.assertRaises(ImproperlyConfigured):
+                connection_created.send(sender=connection.__class__, connection=connection)
+
+
+
+class BulkSessionFlowTestCase(SessionTestCase):
+    """Test classroom-style bulk join and end"""
+    
+    def setUp(self):
+        super().setUp()
+        self.sessions = [
+            Session.objects.create(
+                expert=self.expert,
+                student=student,
+                start_at=self.start_time + timedelta(hours=hour),
+                end_at=self.end_time + timedelta(hours=hour),
+                status=SessionStatus.BOOKED
+            )
+            for hour, student in enumerate([self.student1, self.student2])
+        ]
+        self.session_ids = [str(session.id) for session in self.sessions]
+    
+    def test_bulk_join_and_end(self):
+        """Test many sessions are joined and ended with per-session outcomes"""
+        missing_id = '00000000-0000-0000-0000-000000000000'
+        
+        response = self.client.post(
+            '/api/sessions/join/bulk/', {'session_ids': self.session_ids + [missing_id]}, format='json'
+        )
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], {
+            self.session_ids[0]: 'joined',
+            self.session_ids[1]: 'joined',
+            missing_id: 'not_found',
+        })
+        
+        with mock.patch('apps.sessions.tasks.enqueue_summaries') as enqueue_summaries:
+            response = self.client.post('/api/sessions/end/bulk/', {'session_ids': self.session_ids}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'].values()), {'ended'})
+        self.assertEqual(
+            Session.objects.filter(status=SessionStatus.COMPLETED).count(), 2
+        )
+        # All summary tasks go out in a single batch
+        enqueue_summaries.assert_called_once()
+        self.assertEqual(len(enqueue_summaries.call_args.args[0]), 2)
+        
+        stats = ExpertStats.objects.get(expert=self.expert)
+        self.assertEqual(stats.completed_sessions, 2)
+        self.assertEqual(stats.completed_minutes, 120)
+    
+    def test_bulk_end_rejects_unjoined_sessions(self):
+        """Test sessions in the wrong state are reported and left untouched"""
+        response = self.client.post('/api/sessions/end/bulk/', {'session_ids': self.session_ids}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'].values()), {'invalid_state'})
+        self.assertFalse(Session.objects.filter(status=SessionStatus.COMPLETED).exists())
+
+
+
+@override_settings(BOOKING_RATE_LIMITS={
+    'student': {'capacity': 2, 'per_second': 0.01},
+    'expert': {'capacity': 50, 'per_second': 5},
+    'global': {'capacity': 500, 'per_second': 200},
+})
+class BookingRateLimitTestCase(SessionTestCase):
+    """Test rate limiting and load shedding on booking"""
+    
+    def setUp(self):
+        super().setUp()
+        ratelimit.reset()
+        self.data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(self.student1.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': self.end_time.isoformat()
+        }
+    
+    def tearDown(self):
+        ratelimit.reset()
+    
+    def test_student_limit_returns_429(self):
+        """Test a student over their token bucket is rejected with Retry-After"""
+        for _ in range(2):
+            response = self.client.post('/api/sessions/book/', self.data, format='json')
+            self.assertIn(response.status_code, [200, 201])
+        
+        response = self.client.post('/api/sessions/book/', self.data, format='json')
+        
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        
+        # Other students are not affected
+        self.data['student_id'] = str(self.student2.id)
+        self.data['start_at'] = (self.start_time + timedelta(days=1)).isoformat()
+        self.data['end_at'] = (self.end_time + timedelta(days=1)).isoformat()
+        response = self.client.post('/api/sessions/book/', self.data, format='json')
+        self.assertEqual(response.status_code, 201)
+    
+    def test_slow_database_sheds_load(self):
+        """Test bookings are rejected while DB latency is over the threshold"""
+        ratelimit.shedder.record(10)
+        
+        response = self.client.post('/api/sessions/book/', self.data, format='json')
+        
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(Session.objects.exists())
+    
+    def test_rejected_request_spends_no_tokens(self):
+        """Test a bucket that rejects the request leaves the other buckets untouched"""
+        store = ratelimit.LocalBucketStore()
+        self.assertEqual(store.consume([('expert', 1, 0.001)]), 0)
+        
+        self.assertGreater(store.consume([('student', 1, 0.001), ('expert', 1, 0.001)]), 0)
+        self.assertEqual(store.consume([('student', 1, 0.001)]), 0)
+    
+    def test_cache_store_counts_atomically(self):
+        """Test the shared store admits exactly capacity requests and refunds rejections"""
+        store = ratelimit.CacheBucketStore()
+        cache.clear()
+        
+        self.assertEqual(store.consume([('expert', 2, 0.001)]), 0)
+        self.assertEqual(store.consume([('expert', 2, 0.001)]), 0)
+        self.assertGreater(store.consume([('student', 2, 0.001), ('expert', 2, 0.001)]), 0)
+        
+        self.assertEqual(store.consume([('student', 2, 0.001)]), 0)
+        self.assertEqual(store.consume([('student', 2, 0.001)]), 0)
+    
+    def test_recurring_and_waitlist_are_limited(self):
+        """Test the other endpoints that run the overlap query share the booking limits"""
+        data = dict(self.data, occurrences=1)
+        with override_settings(BOOKING_RATE_LIMITS={
+            'student': {'capacity': 1, 'per_second': 0.001},
+            'expert': {'capacity': 50, 'per_second': 5},
+            'global': {'capacity': 500, 'per_second': 200},
+        }):
+            self.assertEqual(self.client.post('/api/sessions/book/recurring/', data, format='json').status_code, 201)
+            self.assertEqual(self.client.post('/api/sessions/book/recurring/', data, format='json').status_code, 429)
+            self.assertEqual(self.client.post('/api/sessions/waitlist/', self.data, format='json').status_code, 429)
+    
+    def test_local_buckets_are_bounded(self):
+        """Test the in-process store drops the least recently used buckets"""
+        store = ratelimit.LocalBucketStore(max_buckets=2)
+        for key in ['a', 'b', 'c']:
+            store.consume([(key, 1, 0.001)])
+        
+        self.assertEqual(list(store._buckets), ['b', 'c'])
+
+
+
+class WaitlistTestCase(SessionTestCase):
+    """Test waitlisting and promotion on cancellation"""
+    
+    def setUp(self):
+        super().setUp()
+        self.session = Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.BOOKED
+        )
+        self.student3 = Student.objects.create(
+            name="Test Student 3",
+            email="student3@test.com"
+        )
+    
+    def _join_waitlist(self, student):
+        data = {
+            'expert_id': str(self.expert.id),
+            'student_id': str(student.id),
+            'start_at': self.start_time.isoformat(),
+            'end_at': self.end_time.isoformat()
+        }
+        return self.client.post('/api/sessions/waitlist/', data, format='json')
+    
+    def test_waitlist_positions(self):
+        """Test waitlist is FIFO and joining twice is idempotent"""
+        self.assertEqual(self._join_waitlist(self.student2).data['position'], 1)
+        self.assertEqual(self._join_waitlist(self.student3).data['position'], 2)
+        
+        response = self._join_waitlist(self.student2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['position'], 1)
+    
+    def test_cancellation_promotes_first_waiting_student(self):
+        """Test cancelling a session books the head of the waitlist"""
+        self._join_waitlist(self.student2)
+        self._join_waitlist(self.student3)
+        
+        response = self.client.post('/api/sessions/cancel/', {'session_id': str(self.session.id)}, format='json')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['promoted_session_ids']), 1)
+        
+        promoted = Session.objects.get(id=response.data['promoted_session_ids'][0])
+        self.assertEqual(promoted.student, self.student2)
+        self.assertEqual(promoted.status, SessionStatus.BOOKED)
+        self.assertEqual(
+            WaitlistEntry.objects.get(student=self.student2).status, WaitlistStatus.PROMOTED
+        )
+        self.assertEqual(
+            WaitlistEntry.objects.get(student=self.student3).status, WaitlistStatus.WAITING
+        )
+    
+    def test_free_slot_cannot_be_waitlisted(self):
+        """Test the waitlist is only for slots the expert already has taken"""
+        self.session.delete()
+        
+        response = self._join_waitlist(self.student2)
+        
+        self.assertEqual(response.status_code, 400)
+    
+    def test_holder_cannot_waitlist_own_slot(self):
+        """Test a student cannot queue for a slot they already hold"""
+        response = self._join_waitlist(self.student1)
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['conflict'], 'student')
+        self.assertFalse(WaitlistEntry.objects.exists())
+    
+    def test_cancelling_student_is_not_promoted_back(self):
+        """Test promotion skips the student whose session freed the slot"""
+        WaitlistEntry.objects.create(
+            expert=self.expert, student=self.student1,
+            start_at=self.start_time, end_at=self.end_time
+        )
+        self._join_waitlist(self.student2)
+        
+        response = self.client.post('/api/sessions/cancel/', {'session_id': str(self.session.id)}, format='json')
+        
+        promoted = Session.objects.get(id=response.data['promoted_session_ids'][0])
+        self.assertEqual(promoted.student, self.student2)
+        self.assertFalse(Session.objects.filter(student=self.student1, status=SessionStatus.BOOKED).exists())
+    
+    def test_unknown_student_is_not_found(self):
+        """Test an unknown student returns 404 rather than 500"""
+        response = self._join_waitlist(Student(id=uuid.uuid4()))
+        
+        self.assertEqual(response.status_code, 404)
+
+
+
+@override_settings(TRACING_ENABLED=True, TRACING_EXPORTER='apps.core.tracing.InMemorySpanExporter')
+class TracingTestCase(SessionTestCase):
+    """Test one trace covers the request through to summary generation"""
+    
+    def setUp(self):
+        super().setUp()
+        self.exporter = tracing.get_exporter()
+        self.exporter.clear()
+        self.session = Session.objects.create(
+            expert=self.expert,
+            student=self.student1,
+            start_at=self.start_time,
+            end_at=self.end_time,
+            status=SessionStatus.JOINED
+        )
+    
+    def test_trace_propagates_to_summary_task(self):
+        """Test request, service, SQL, publish and task spans share a trace"""
+        with mock.patch.object(generate_session_summary, 'apply_async') as apply_async:
+            response = self.client.post('/api/sessions/end/', {'session_id': str(self.session.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        spans = {span.name: span for span in self.exporter.spans}
+        root = spans['HTTP POST /api/sessions/end/']
+        service = spans['SessionStateService.end_session']
+        publish = spans['celery.publish generate_session_summary']
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(service.parent_id, root.span_id)
+        self.assertEqual(publish.parent_id, service.span_id)
+        self.assertTrue(any(span.name == 'db.query' for span in self.exporter.spans))
+        self.assertEqual({span.trace_id for span in self.exporter.spans}, {root.trace_id})
+        
+        # Run the task with the headers that would have gone to the broker
+        headers = apply_async.call_args.kwargs['headers']
+        generate_session_summary.apply(args=[str(self.session.id)], headers=headers)
+        
+        task = next(span for span in self.exporter.spans if span.name == 'celery.task generate_session_summary')
+        self.assertEqual(task.trace_id, root.trace_id)
+        self.assertEqual(task.parent_id, publish.span_id)
+        self.assertGreaterEqual(task.end_ns, root.start_ns)
+    
+    @override_settings(TRACING_ENABLED=False)
+    def test_disabled_tracing_records_nothing(self):
+        """Test spans are no-ops while tracing is off"""
+        with tracing.start_span('noop') as span:
+            self.assertIsNone(span)
+        self.assertEqual(tracing.inject(), {})
+        self.assertEqual(self.exporter.spans, [])
+
+
+PERF_BASELINE_PATH = Path(__file__).with_name('perf_baseline.json')
+# Allowed slowdown against the recorded baseline, plus absolute slack for tiny timings
+PERF_TOLERANCE = float(os.getenv('PERF_TOLERANCE', '3'))
+PERF_SLACK_MS = float(os.getenv('PERF_SLACK_MS', '5'))
+PERF_RUNS = 7
+
+
+@override_settings(BOOKING_RATE_LIMIT_BACKEND='local')  # reset() can only clear in-process buckets
+class PerformanceBudgetTestCase(TestCase):
+    """
+    Query-count and wall-clock budgets on a seeded medium dataset.
+    Timings are the median of PERF_RUNS runs and are compared with
+    tests/perf_baseline.json; run with UPDATE_PERF_BASELINE=1 to re-record
+    the timings of the tests that ran.
+    """
+    results = {}
+    
+    @classmethod
+    def setUpTestData(cls):
+        cls.experts = Expert.objects.bulk_create([
+            Expert(name=f"Expert {i}", email=f"expert{i}@perf.test") for i in range(10)
+        ])
+        cls.students = Student.objects.bulk_create([
+            Student(name=f"Student {i}", email=f"student{i}@perf.test") for i in range(50)
+        ])
+        
+        # 1000 booked sessions spread over the next 50 days
+        base = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+        Session.objects.bulk_create([
+            Session(
+                expert=cls.experts[i % 10],
+                student=cls.students[i % 50],
+                start_at=base + timedelta(hours=i // 10),
+                end_at=base + timedelta(hours=i // 10, minutes=45)
+            )
+            for i in range(1000)
+        ])
+        ExpertStatsService.rebuild()
+        
+        cls.expert = cls.experts[0]
+        cls.student = Student.objects.create(name="Perf Student", email="perf@perf.test")
+        cls.free_slot = base - timedelta(hours=12)
+    
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if os.getenv('UPDATE_PERF_BASELINE'):
+            # Merge, so re-recording a subset keeps the other baselines
+            baseline = json.loads(PERF_BASELINE_PATH.read_text()) if PERF_BASELINE_PATH.exists() else {}
+            baseline.update(cls.results)
+            PERF_BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+    
+    def setUp(self):
+        self.client = APIClient()
+        ratelimit.reset()
+        self.baseline = json.loads(PERF_BASELINE_PATH.read_text()) if PERF_BASELINE_PATH.exists() else {}
+    
+    def _slot(self, offset):
+        start_at = self.free_slot - timedelta(hours=offset + 1)
+        return start_at, start_at + timedelta(minutes=30)
+    
+    def _booked_session(self, offset, status=SessionStatus.BOOKED):
+        start_at, end_at = self._slot(offset)
+        return Session.objects.create(
+            expert=self.expert, student=self.student, start_at=start_at, end_at=end_at, status=status
+        )
+    
+    def assertWithinBaseline(self, name, run, prepare=lambda i: None):
+        """Time run(prepare(i)) PERF_RUNS times and compare the median with the baseline"""
+        timings = []
+        for i in range(PERF_RUNS):
+            arg = prepare(i)
+            started = time.perf_counter()
+            run(arg)
+            timings.append((time.perf_counter() - started) * 1000)
+        median_ms = statistics.median(timings)
+        self.results[name] = round(median_ms, 3)
+        
+        if name in self.baseline and not os.getenv('UPDATE_PERF_BASELINE'):
+            budget_ms = self.baseline[name] * PERF_TOLERANCE + PERF_SLACK_MS
+            self.assertLessEqual(
+                median_ms, budget_ms,
+                f"{name} took {median_ms:.2f} ms, budget {budget_ms:.2f} ms (baseline {self.baseline[name]} ms)"
+            )
+    
+    def test_create_or_get_session_queries(self):
+        """Idempotency lookup, combined overlap check, insert, stats update"""
+        service = SessionIdempotencyService(SessionDoubleBookingValidator())
+        start_at, end_at = self._slot(0)
+        
+        with self.assertNumQueries(4):
+            session, created = service.create_or_get_session(self.expert, self.student, start_at, end_at)
+        self.assertTrue(created)
+        
+        with self.assertNumQueries(1):
+            service.create_or_get_session(self.expert, self.student, start_at, end_at)
+        
+        self.assertWithinBaseline(
+            'create_or_get_session',
+            lambda slot: service.create_or_get_session(self.expert, self.student, *slot),
+            prepare=lambda i: self._slot(i + 1)
+        )
+    
+    def test_join_session_queries(self):
+        """Save plus next-slot refresh"""
+        session = self._booked_session(0)
+        
+        with self.assertNumQueries(2):
+            SessionStateService.join_session(session)
+        
+        self.assertWithinBaseline(
+            'join_session', SessionStateService.join_session, prepare=lambda i: self._booked_session(i + 1)
+        )
+    
+    @mock.patch.object(generate_session_summary, 'apply_async')
+    def test_end_session_queries(self, apply_async):
+        """Save plus completion stats; the broker publish is not a query"""
+        session = self._booked_session(0, status=SessionStatus.JOINED)
+        
+        with self.assertNumQueries(2):
+            SessionStateService.end_session(session)
+        apply_async.assert_called_once()
+        
+        self.assertWithinBaseline(
+            'end_session', SessionStateService.end_session,
+            prepare=lambda i: self._booked_session(i + 1, status=SessionStatus.JOINED)
+        )
+    
+    def test_generate_session_summary_queries(self):
+        """One joined fetch and one conditional update"""
+        session = self._booked_session(0, status=SessionStatus.COMPLETED)
+        
+        with self.assertNumQueries(2):
+            generate_session_summary(str(session.id))
+        
+        self.assertWithinBaseline(
+            'generate_session_summary', lambda session_id: generate_session_summary(session_id),
+            prepare=lambda i: str(self._booked_session(i + 1, status=SessionStatus.COMPLETED).id)
+        )
+    
+    def test_book_endpoint_queries(self):
+        """Savepoint, expert, student, idempotency, overlap, insert, stats, release"""
+        def payload(slot):
+            return {
+                'expert_id': str(self.expert.id),
+                'student_id': str(self.student.id),
+                'start_at': slot[0].isoformat(),
+                'end_at': slot[1].isoformat()
+            }
+        
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/sessions/book/', payload(self._slot(0)), format='json')
+        self.assertEqual(response.status_code, 201)
+        
+        # Idempotent repeat: no overlap check, no writes, related rows already joined
+        with self.assertNumQueries(5):
+            response = self.client.post('/api/sessions/book/', payload(self._slot(0)), format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        self.assertWithinBaseline(
+            'book_endpoint',
+            lambda data: self.client.post('/api/sessions/book/', data, format='json'),
+            prepare=lambda i: (ratelimit.reset(), payload(self._slot(i + 1)))[1]
+        )
+    
+    def test_join_and_end_endpoint_queries(self):
+        """Joined session fetch, save, stats update for each transition"""
+        session = self._booked_session(0)
+        
+        with self.assertNumQueries(3):
+            response = self.client.post('/api/sessions/join/', {'session_id': str(session.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        with mock.patch.object(generate_session_summary, 'apply_async'):
+            with self.assertNumQueries(3):
+                response = self.client.post('/api/sessions/end/', {'session_id': str(session.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        self.assertWithinBaseline(
+            'join_endpoint',
+            lambda data: self.client.post('/api/sessions/join/', data, format='json'),
+            prepare=lambda i: {'session_id': str(self._booked_session(i + 1).id)}
+        )
+    
+    def test_recurring_endpoint_queries(self):
+        """Savepoint, expert, student, existing slots, overlap, insert, stats, release"""
+        def payload(offset, occurrences):
+            start_at, end_at = self._slot(offset)
+            return {
+                'expert_id': str(self.expert.id),
+                'student_id': str(self.student.id),
+                'start_at': (start_at + timedelta(days=60)).isoformat(),
+                'end_at': (end_at + timedelta(days=60)).isoformat(),
+                'interval_days': 1,
+                'occurrences': occurrences
+            }
+        
+        for offset, occurrences in [(0, 2), (1, 20)]:
+            with self.assertNumQueries(8):
+                response = self.client.post('/api/sessions/book/recurring/', payload(offset, occurrences), format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.data['sessions']), occurrences)
+        
+        self.assertWithinBaseline(
+            'recurring_endpoint',
+            lambda data: self.client.post('/api/sessions/book/recurring/', data, format='json'),
+            prepare=lambda i: (ratelimit.reset(), payload(i + 2, 4))[1]
+        )
+    
+    def test_bulk_endpoint_queries(self):
+        """Savepoint, locked fetch, conditional update, stats per expert, release; flat in batch size"""
+        offsets = iter(range(10000))
+        
+        def sessions(count, status=SessionStatus.BOOKED):
+            # Past the seeded window, which only leaves a few free slots before it
+            base = self.free_slot + timedelta(days=60)
+            starts = [base + timedelta(hours=next(offsets)) for _ in range(count)]
+            return [str(session.id) for session in Session.objects.bulk_create([
+                Session(
+                    expert=self.expert, student=self.student, status=status,
+                    start_at=start_at, end_at=start_at + timedelta(minutes=30)
+                )
+                for start_at in starts
+            ])]
+        
+        for count in (2, 50):
+            data = {'session_ids': sessions(count)}
+            with self.assertNumQueries(5):
+                response = self.client.post('/api/sessions/join/bulk/', data, format='json')
+            self.assertEqual(response.status_code, 200)
+        
+        with mock.patch('apps.sessions.tasks.enqueue_summaries'):
+            for count in (2, 50):
+                data = {'session_ids': sessions(count, SessionStatus.JOINED)}
+                with self.assertNumQueries(5):
+                    response = self.client.post('/api/sessions/end/bulk/', data, format='json')
+                self.assertEqual(response.status_code, 200)
+        
+        self.assertWithinBaseline(
+            'bulk_join_endpoint',
+            lambda data: self.client.post('/api/sessions/join/bulk/', data, format='json'),
+            prepare=lambda i: {'session_ids': sessions(20)}
+        )
+    
+    def test_cancel_endpoint_queries(self):
+        """Joined fetch, savepoint, conditional update, stats refresh, waitlist lookup, release"""
+        session = self._booked_session(0)
+        
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/sessions/cancel/', {'session_id': str(session.id)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        
+        self.assertWithinBaseline(
+            'cancel_endpoint',
+            lambda data: self.client.post('/api/sessions/cancel/', data, format='json'),
+            prepare=lambda i: {'session_id': str(self._booked_session(i + 1).id)}
+        )
+    
+    def test_waitlist_endpoint_queries(self):
+        """Savepoint, expert, student, overlap, get_or_create (lookup, savepoint, insert, release), position, release"""
+        other = Student.objects.create(name="Perf Waiter", email="waiter@perf.test")
+        
+        def payload(offset):
+            session = self._booked_session(offset)
+            return {
+                'expert_id': str(self.expert.id),
+                'student_id': str(other.id),
+                'start_at': session.start_at.isoformat(),
+                'end_at': session.end_at.isoformat()
+            }
+        
+        data = payload(0)
+        with self.assertNumQueries(10):
+            response = self.client.post('/api/sessions/waitlist/', data, format='json')
+        self.assertEqual(response.status_code, 201)
+        
+        self.assertWithinBaseline(
+            'waitlist_endpoint',
+            lambda data: self.client.post('/api/sessions/waitlist/', data, format='json'),
+            prepare=lambda i: (ratelimit.reset(), payload(i + 1))[1]
+        )